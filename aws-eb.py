@@ -6,14 +6,15 @@ on AWS EC2 instances and syncs the binaries with S3 buckets
 """
 # internal modules
 import sys, os, argparse, json, configparser, platform, subprocess
-import datetime, tarfile, zipfile, textwrap, socket, json, inspect
-import math, signal, shlex, time, re, traceback, operator, glob 
-import shutil, tempfile, concurrent.futures
+import datetime, tarfile, gzip, zipfile, textwrap, socket, json, inspect
+import signal, shlex, time, re, traceback, operator, glob 
+import shutil, tempfile, concurrent.futures, functools, collections, io, fnmatch, selectors
+import threading
 if sys.platform.startswith('linux'):
     import getpass, pwd, grp
 # stuff from pypi
 try:
-    import boto3, botocore, urllib3
+    import urllib3
     import requests    
     from packaging.version import parse, InvalidVersion    
     # I pulled these from github, likely not the proper way to do it
@@ -27,9 +28,46 @@ except:
     pass
     #print('Error: EasyBuild not found. Please install it first.')
 
+def _import_boto3():
+    # boto3 takes up to half a second to import, only load it once AWS is used
+    global boto3, botocore, TransferConfig
+    try:
+        import boto3, botocore, botocore.exceptions
+        from boto3.s3.transfer import TransferConfig
+    except ImportError:
+        print('Error: boto3 package not found. Install it first, please run:')
+        print('python3 -m pip install --user --upgrade boto3')
+        sys.exit(1)
+
 __app__ = 'AWS-EB, a user friendly build tool for AWS EC2'
 __version__ = '0.40'
 
+# local timezone, resolved once instead of on every astimezone() call
+_LOCAL_TZ = datetime.datetime.now().astimezone().tzinfo
+
+# binary size units, index i is 1024**i bytes
+_SIZE_NAMES = ("B", "KiB", "MiB", "GiB", "TiB", "PiB", "EiB")
+
+# a decimal number like a price in an AWS error message
+_FLOAT_RE = re.compile(r'\d+\.\d+')
+
+# software and toolchain version in an easyconfig file name 
+_EB_VERSION_RE = re.compile(r'-(\d+(?:\.\d+)*)(?:-(\w+(?:-\d+(?:\.\d+)*(?:[ab]\d+)?)?))?\.')
+
+@functools.lru_cache(maxsize=65536)
+def _eb_version_key(filename):
+    # sort key (software, toolchain) for an easyconfig file name, None if no version
+    match = _EB_VERSION_RE.search(filename)
+    if not match:
+        return None
+    toolchain = match.group(2) if match.group(2) else '0'  # Default to '0' if no toolchain
+    try:
+        toolchain = parse(toolchain)
+    except InvalidVersion:
+        # Assume non-standard versions are older, set them as the minimum
+        toolchain = parse('0')
+    return parse(match.group(1)), toolchain
+
 def main():
         
     if args.debug:
@@ -113,10 +151,7 @@ def subcmd_config(args, cfg, aws):
                 print('Please run "git clone https://github.com/easybuilders/easybuild-easyconfigs" first.')
                 return False
         print(f'Processing folder "{ecfgroot}" ... \n')
-        slist = []
-        for root, dirs, files in cfg._walker(ecfgroot):            
-            if glob.glob(os.path.join(root, '*.eb')):
-                slist.append(f'{os.path.basename(root).lower()},{os.path.basename(root)}')
+        slist = [f'{b.lower()},{b}' for _, b in cfg._walk_eb_dirs(ecfgroot)]
         slist.sort()
         print('\n'.join(slist))
         print(f'\nProcessed folder "{ecfgroot}" with {len(slist)} software packages.')
@@ -154,7 +189,7 @@ def subcmd_config(args, cfg, aws):
             print("Done!",flush=True)
 
     # general setup 
-    defdom = cfg.get_domain_name()
+    defdom = cfg.domain_name
     whoami = getpass.getuser()
 
     if args.monitor:
@@ -275,7 +310,7 @@ def subcmd_launch(args,cfg,bld,aws):
         # create an initial copy of the binaries 
         print(f'Creating initial copy from {args.firstbucket} to {cfg.bucket} ...', flush=True)
         aws.s3_duplicate_bucket(args.firstbucket, cfg.bucket)
-    os_id, version_id = cfg.get_os_release_info()
+    os_id, version_id = cfg.os_release_info
     if not os_id or not version_id:
         print('Could not determine OS release information.')
         return False        
@@ -310,7 +345,7 @@ def subcmd_download(args,cfg,bld,aws):
     if args.prefix:
         s3_prefix = args.prefix
     else:   
-        os_id, version_id = cfg.get_os_release_info()
+        os_id, version_id = cfg.os_release_info
         if not os_id or not version_id:
             print('Could not determine OS release information.')
             return False        
@@ -364,7 +399,7 @@ def subcmd_download(args,cfg,bld,aws):
     print(f" Untarring packages ... ", flush=True)    
     #all_tars, new_tars = bld._untar_eb_software(os.path.join(bld.eb_root, 'software'))
     pref = f'{cfg.archiveroot}/{s3_prefix}/software'
-    aws.s3_download_untar(cfg.bucket, pref, os.path.join(bld.eb_root, 'software'),args.vcpus*50)
+    aws.s3_download_untar(cfg.bucket, pref, os.path.join(bld.eb_root, 'software'), bld._io_workers)
 
     print('All software was downloaded to:', bld.eb_root)
 
@@ -380,32 +415,25 @@ def subcmd_buildstatus(args,cfg,aws):
     jf = f'{cfg.archiveroot}/{args.prefix}/eb-build-status.json'
     print(f'\nSummarizing s3://{cfg.bucket}/{jf} ...\n')
     statdict = aws.s3_get_json(jf)
-    summary = {}
+    if statdict is None:
+        return False
+    # count statuses and the reasons under each status
+    totals = collections.Counter()
+    reasons = collections.defaultdict(collections.Counter)
     for item in statdict.values():
         status = item.get('status', 'unknown')
-        reason = item.get('reason', 'unknown')
-        # Initialize status in the summary if not present
-        if status not in summary:
-            summary[status] = {'count': 0, 'reasons': {}}
-        # Increment status count
-        summary[status]['count'] += 1
-        # Count reason occurrences under each status
-        if reason in summary[status]['reasons']:
-            summary[status]['reasons'][reason] += 1
-        else:
-            summary[status]['reasons'][reason] = 1
-    # Sorting reasons by occurrences under each status
-    for status in summary:
-        sorted_reasons = sorted(summary[status]['reasons'].items(), key=lambda x: x[1], reverse=True)
-        summary[status]['reasons'] = sorted_reasons       
-    # Print summary pretty
-    for status, details in summary.items():
+        totals[status] += 1
+        reasons[status][item.get('reason', 'unknown')] += 1
+    # Print summary pretty, reasons sorted by occurrences under each status
+    for status, count in totals.items():
         print(f"Status: '{status}'")
-        print(f"  Total Occurrences: {details['count']}")
+        print(f"  Total Occurrences: {count}")
         print("  Reasons:")
-        for reason, count in details['reasons']:
-            if count > 1:
-                print(f"    - {reason}: {count} occurrences")
+        # most_common(k) uses heapq.nlargest, no need to sort the long tail
+        for reason, rcount in reasons[status].most_common(50):
+            if rcount <= 1:
+                break
+            print(f"    - {reason}: {rcount} occurrences")
         print()        
     #print(json.dumps(summary, indent=4))
     return True
@@ -487,6 +515,9 @@ def subcmd_ssh(args, cfg, aws):
     print('This option is not supported.')
     
 class Builder:
+    # '* module (easyconfig.eb)' lines in the output of 'eb --missing-modules'
+    _MISSING_RE = re.compile(rb'^\* (\S+) \((\S+\.eb)\)', re.MULTILINE)
+
     def __init__(self, args, cfg, aws):
         self.args = args
         self.cfg = cfg
@@ -502,20 +533,34 @@ class Builder:
             self.min_toolchains = {'system': 'system', 'GCC': '11.0', 'GCCcore' : '11.0', 
                                    'LLVM' : '12.0', 'foss' : '2022a', 'gfbf': '2022a'}
             self.cfg.write('general', 'min_toolchains', self.min_toolchains)
+        # parse the minimum toolchain versions only once
+        self._mt_parsed = {k: self.cfg.sversion(v) for k, v in self.min_toolchains.items()}
         self.eb_root = '/opt/eb'
+        # download/extract threads, more than 32 only adds GIL and scheduler contention
+        self._io_workers = min(32, max(4, getattr(self.args, 'vcpus', 4)*2))
         self.copydelay = 3600 # 1 hour delay between 2 uploads or 2 downloads to save costs
+        self.statusdelay = 30 # min seconds between 2 writes of eb-build-status.json
+        self._statdict_dirty = False
+        self._statdict_last_flush = 0.0
 
     def build_all_eb(self, easyconfigroot, s3_prefix, include, exclude):
 
-        includes = include.split(',') if include else []
-        excludes = exclude.split(',') if exclude else []
+        includes = frozenset(include.split(',')) if include else frozenset()
+        excludes = frozenset(exclude.split(',')) if exclude else frozenset()
+        mt_names = frozenset(self.min_toolchains)
+        sversion = self.cfg.sversion
 
         # install a lot of required junk 
         #if not self.args.debug:
             #self._install_os_dependencies(easyconfigroot, minimal=True)        
         untar = os.path.join(self.cfg.binfolderx,'untar')
         if os.path.exists(f'{untar}.go'):
-            subprocess.run(['go', 'build', '-o', untar, f'{untar}.go'], shell=True)
+            # only rebuild if the binary is missing or older than the source
+            if not os.path.exists(untar) or os.path.getmtime(f'{untar}.go') > os.path.getmtime(untar):
+                try:
+                    subprocess.run(['go', 'build', '-o', untar, f'{untar}.go'], check=True)
+                except (subprocess.CalledProcessError, FileNotFoundError) as e:
+                    print(f'  Could not build {untar}: {e}', flush=True)
         # set up easybuild config 
         opts, _ = set_up_configuration(args=[], silent=True)
         softwaredir = os.path.join(self.eb_root, 'software')
@@ -523,256 +568,209 @@ class Builder:
         # build all new easyconfigs in a folder tree
         ebcnt = 0; ebskipped = 0; bldcnt = 0; errcnt = 0; errpkg = []        
         uploadtime = 0; downloadtime = 0 # timestamps for last upload/download to avoid too many uploads/downloads
-        statdict = self.aws.s3_get_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json')
-        for root, dirs, files in self.cfg._walker(easyconfigroot):
-            print(f'  Processing folder "{root}" newest easyconfigs... ')
+        status_key = f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json'
+        software_pref = f'{self.cfg.archiveroot}/{s3_prefix}/software'
+        statdict = self.aws.s3_get_json(status_key)
+        if statdict is None:
+            # writing an empty dict back would erase the build history
+            print(f'  Could not read s3://{self.cfg.bucket}/{status_key}, stopping the build.', flush=True)
+            return False
+
+        # scan all folders in parallel (listdir + easyconfig parsing), the builds
+        # themselves have to run one after another as they share /opt/eb
+        roots = [root for root, _ in self.cfg._walk_eb_dirs(easyconfigroot)]
+        print(f'  Scanning {len(roots)} folders for newest easyconfigs ... ', flush=True)
+        scanned = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=min(32, 4*(os.cpu_count() or 1))) as executor:
+            futures = {executor.submit(self._process_eb_folder, root, statdict): root for root in roots}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    scanned[futures[future]] = future.result()
+                except Exception as e:
+                    print(f'  * Error scanning folder "{futures[future]}": {e}', flush=True)
+
+        # install the OS dependencies of everything we will try to build in one go,
+        # easyconfigs filtered by min_toolchains, --include or --exclude are left out
+        all_osdeps = []; ecbuild = 0
+        for _, _, ecinfo in scanned.values():
+            if not ecinfo or not ecinfo[3]:
+                continue
             try:
-                if easyconfigroot==root:
-                    # main directory do something there
-                    pass
-                ebfile = self._get_latest_easyconfig(root)
-                if not ebfile:
-                    print(f'  * no valid easyconfig found in {root}', flush=True)
+                if self._ec_skip_reason(ecinfo, includes, excludes):
                     continue
-                ebpath = os.path.join(root, ebfile)
-                if not os.path.isfile(ebpath):
-                    print(f'  * Path {ebpath} is not a file', flush=True)                    
-                    continue 
-                print(f'############## EASYCONFIG: "{ebfile}" ... ##################', flush=True)
-                trydate = datetime.datetime.now().astimezone().isoformat()                
-                statdict_template = {
-                                    "status": "unknown",  # unknown, skipped, success, error
-                                    "reason": "n/a",
-                                    "returncode" : -1,
-                                    "errorcount" : 0,
-                                    "trydate" : trydate,
-                                    "buildtime" : 0,
-                                    "modules" : None
-                                }                        
-                retcode=-1; ebcnt+=1; ebskipped+=1            
-                print(f'  * Current time (trydate): {trydate}')
-                if ebfile in statdict.keys():
-                    if statdict[ebfile]['status'] != 'skipped' or self.args.checkskipped == False:
-                        print(f'  * ignoring {ebfile}, it was run with status {statdict[ebfile]["status"]} at {statdict[ebfile]["trydate"]}.', flush=True)
-                        print(f'    Remove from eb-build-status.json to try again ...', flush=True)
+            except Exception:
+                continue # the build loop reports broken easyconfigs
+            all_osdeps.extend(ecinfo[3]); ecbuild += 1
+        if all_osdeps:
+            print(f'  installing OS dependencies of {ecbuild} easyconfigs ...', flush=True)
+            self.cfg.install_os_packages(all_osdeps)
+
+        try:
+            for root in roots:
+                # skipped easyconfigs are only written every self.statusdelay seconds
+                self._maybe_flush_status(statdict, status_key)
+                # thousands of folders are skipped, so the messages of the skip path are
+                # not flushed one by one, the next flushed print before eb runs writes them out
+                print(f'  Processing folder "{root}" newest easyconfigs... ')
+                try:
+                    if root not in scanned:
                         continue
-                    else:
-                        if self.args.checkskipped: # checkskipped = re-run previously checked skipped builds
-                            print(f'  * checkskipped is set, trying {ebfile} again ...', flush=True) 
-                statdict = self.aws.s3_get_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json')
-                if ebfile not in statdict.keys():
-                    statdict[ebfile] = statdict_template        
-
-                ## first kill other non-functional instances
-                ilist = self.aws.ec2_list_instances('Name', 'AWSEBSelfDestruct')
-                instances = [sublist[1] for sublist in ilist if sublist]
-                for inst in instances:
-                    if self.aws.monitor_has_instance_failed(inst, True):
-                        print(f'  * Instance {inst} has failed, terminating it ... ', flush=True)
-                        self.aws.ec2_terminate_instance(inst)
-                # end instance kill       
-
-                ############# check for supported toolchains, included or excluded classes #############
-                name, version, tc, osdep, cls, instdir = self._read_easyconfig(ebpath)                
-                if name in self.min_toolchains.keys(): # if this is the toolchain package itself    
-                    if self.cfg.sversion(version) < self.cfg.sversion(self.min_toolchains[name]):
-                        print(f'  * Easyconfig {name} version {version} too old according to min_toolchains.', flush=True)
-                        statdict[ebfile]['status'] = 'skipped'
-                        statdict[ebfile]['reason'] = f'toolchain version too old: {version}'
-                        self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
+                    ebfile, ebpath, ecinfo = scanned[root]
+                    if not ebfile:
+                        print(f'  * no valid easyconfig found in {root}')
                         continue
-                if tc['name'] not in self.min_toolchains.keys():
-                    print(f'  * Toolchain not supported: {tc["name"]}', flush=True)
-                    statdict[ebfile]['status'] = 'skipped'
-                    statdict[ebfile]['reason'] = f'toolchain not supported: {tc["name"]}'
-                    self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
-                    continue
-                if self.cfg.sversion(tc['version']) < self.cfg.sversion(self.min_toolchains[tc['name']]):
-                    print(f'  * Toolchain version {tc["version"]} of {tc["name"]} too old according to min_toolchains.', flush=True)
-                    statdict[ebfile]['status'] = 'skipped'
-                    statdict[ebfile]['reason'] = f'toolchain version too old: {tc["name"]}-{tc["version"]}'
-                    self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
-                    continue
-                if includes:
-                    if cls not in includes:
-                        # we want to may be only build bio packages
-                        print(f'  * {name} is not a module class in --include {include} ', flush=True)
-                        statdict[ebfile]['status'] = 'skipped'
-                        statdict[ebfile]['reason'] = f'module class not included via --include option'
-                        self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
+                    if not ebpath:
+                        print(f'  * Path {os.path.join(root, ebfile)} is not a file')
                         continue
-                elif excludes:
-                    if cls in excludes:
-                        print(f'  * {name} is a module class in --exclude {exclude} ', flush=True)
-                        statdict[ebfile]['status'] = 'skipped'
-                        statdict[ebfile]['reason'] = f'module class excluded via --exclude option'
-                        self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
+                    print(f'############## EASYCONFIG: "{ebfile}" ... ##################')
+                    trydate = datetime.datetime.now(_LOCAL_TZ).isoformat()                
+                    statdict_template = {
+                                        "status": "unknown",  # unknown, skipped, success, error
+                                        "reason": "n/a",
+                                        "returncode" : -1,
+                                        "errorcount" : 0,
+                                        "trydate" : trydate,
+                                        "buildtime" : 0,
+                                        "modules" : None
+                                    }                        
+                    retcode=-1; ebcnt+=1; ebskipped+=1            
+                    print(f'  * Current time (trydate): {trydate}')
+                    if ebfile in statdict.keys():
+                        if self._is_eb_done(ebfile, statdict):
+                            print(f'  * ignoring {ebfile}, it was run with status {statdict[ebfile]["status"]} at {statdict[ebfile]["trydate"]}.')
+                            print(f'    Remove from eb-build-status.json to try again ...')
+                            continue
+                        else:
+                            if self.args.checkskipped: # checkskipped = re-run previously checked skipped builds
+                                print(f'  * checkskipped is set, trying {ebfile} again ...') 
+                    if ebfile not in statdict.keys():
+                        statdict[ebfile] = dict(statdict_template)
+
+                    ############# check for supported toolchains, included or excluded classes #############
+                    if not ecinfo:
+                        ecinfo = self._read_easyconfig(ebpath)
+                    name, version, tc, osdep, cls, instdir = ecinfo
+                    skip = self._ec_skip_reason(ecinfo, includes, excludes)
+                    if skip:
+                        print(f'  * {skip[0]}')
+                        self._mark_status(statdict, ebfile, 'skipped', skip[1])
                         continue
-                if osdep:
-                    print(f'  installing OS dependencies: {osdep}', flush=True)
-                    self.cfg.install_os_packages(osdep)
 
-                ########## Checking for missing dependencies: easybuild modules ############################
-                themissing = self._eb_missing_modules(ebpath, printout=True)
-                if self.args.debug:
-                    print(f'  * _eb_missing_modules({ebpath}) returned: {themissing}', flush=True)
-                if 'error' in themissing.keys():
-                    print(f'  * _eb_missing_modules({ebpath}) returned an error', flush=True)
-                if not themissing:
-                    print(f'  * {ebfile} and dependencies are already installed.', flush=True)
-                    statdict[ebfile]['status'] = 'success'
-                    statdict[ebfile]['reason'] = 'easyconfig built successfully'
-                    self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
-                    continue
-                errmiss = self._errors_in_missing(themissing, statdict)
-                if errmiss:
-                    print(f'  ******** {ebfile} has missing dependencies with errors: {", ".join(errmiss)}', flush=True)
-                    statdict[ebfile]['status'] = 'skipped'
-                    statdict[ebfile]['reason'] = 'dependencies have errors'
-                    self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
-                    continue
-                # check if min_toolchains exclude any of the missing modules, if so skip this easyconfig
-                doskip = False
-                for miss in themissing.keys():
-                    if '/' in miss:
-                        nam, ver = miss.split('/')
-                    else:
-                        nam, ver = miss, '0.0'
-                    if nam in self.min_toolchains.keys():
-                        if self.cfg.sversion(ver) < self.cfg.sversion(self.min_toolchains[nam]):
-                            print(f'  * {ebfile} requires toolchain {miss} which is too old according to min_toolchains.', flush=True)
-                            doskip = True
-                if doskip:
-                    statdict[ebfile]['status'] = 'skipped'
-                    statdict[ebfile]['reason'] = 'dependency requires too old toolchain'
-                    self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
-                    continue
-                print(f" Downloading previous packages ... ", flush=True)
-                # getsource = True
-                # if self.args.skipsources:
-                #     getsource = False
-                ebskipped-=1
-                if time.time()-downloadtime > self.copydelay:
-                    self.download(f':s3:{self.cfg.archivepath}', self.eb_root, s3_prefix) #downloading modules
-                    print(f" Unpacking previous packages ... ", flush=True)
-                    #all_tars, new_tars = self._untar_eb_software(softwaredir)
-                    pref = f'{self.cfg.archiveroot}/{s3_prefix}/software'
-                    self.aws.s3_download_untar(self.cfg.bucket, pref, os.path.join(self.eb_root, 'software'), self.args.vcpus*50)
-                    downloadtime = time.time()
-                else:
-                    print(f" Skipping download, last download was less than {self.copydelay} seconds ago ... ", flush=True)                
-                                                
-                ######################### Need to install the dependencies first #############################################
-                depterr = False
-                print(f" Installing dependencies for {ebfile} ... ", flush=True)
-                cmdline = "eb --umask=002"
-                for ebf in list(themissing.values())[:-1]:  # Exclude the last one, it is the original package, not a dependency
-                    #if ebf != ebfile:
-                    print(f"  ------------ {ebf} (Dependency) ------------------------ ... ", flush=True)
-                    # install the os dependencies of the eb dependency
-                    try:
-                        pth, ec_dict = self._parse_easyconfig(ebf)                        
-                        deposdep = ec_dict.get('osdependencies', "")
-                        if deposdep:
-                            print(f'  * installing OS dependencies: {deposdep} for {ebf}', flush=True)
-                            self.cfg.install_os_packages(deposdep) 
+                    # listing EC2 instances and 'eb --missing-modules' are independent, run them concurrently
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+                        f_list = executor.submit(self.aws.ec2_list_instances, 'Name', 'AWSEBSelfDestruct')
+                        f_miss = executor.submit(self._eb_missing_modules, ebpath, printout=True)
+
+                        ## first kill other non-functional instances
+                        # ec2_list_instances already has the reachability status in the last column
+                        ilist = f_list.result()
+                        for row in ilist:
+                            if row and row[-1] == '(Failed)':
+                                print(f'  * Instance {row[1]} has failed, terminating it ... ', flush=True)
+                                self.aws.ec2_terminate_instance(row[1])
+                        # end instance kill
+
+                        ########## Checking for missing dependencies: easybuild modules ############################
+                        themissing = f_miss.result()
+                    if self.args.debug:
+                        print(f'  * _eb_missing_modules({ebpath}) returned: {themissing}', flush=True)
+                    if 'error' in themissing.keys():
+                        print(f'  * _eb_missing_modules({ebpath}) returned an error', flush=True)
+                    if not themissing:
+                        print(f'  * {ebfile} and dependencies are already installed.', flush=True)
+                        self._mark_status(statdict, ebfile, 'success', 'easyconfig built successfully')
+                        continue
+                    errmiss = self._errors_in_missing(themissing, statdict)
+                    if errmiss:
+                        print(f'  ******** {ebfile} has missing dependencies with errors: {", ".join(errmiss)}', flush=True)
+                        self._mark_status(statdict, ebfile, 'skipped', 'dependencies have errors')
+                        continue
+                    # check if min_toolchains exclude any of the missing modules, if so skip this easyconfig
+                    doskip = False
+                    for miss in themissing.keys():
+                        if '/' in miss:
+                            nam, ver = miss.split('/')
                         else:
-                            print(f'  * no OS dependencies for {ebf}', flush=True)
-                    except Exception as e:
-                        print(f'  * Could not parse easyconfig {ebf}: {e}', flush=True)
-                    # ebf is the dependency, install the actual package with --robot in the next step
-                    now1=int(time.time())
-                    if 'CUDA' in ebf: # CUDA is a special case, we may not have a GPU installed 
-                        print(f'  * running "{cmdline} --ignore-test-failure {ebf}" ... ', flush=True)
-                        ret = subprocess.run(f'{cmdline} --ignore-test-failure {ebf}', shell=True, text=True)
+                            nam, ver = miss, '0.0'
+                        if nam in mt_names:
+                            if sversion(ver) < self._mt_parsed[nam]:
+                                print(f'  * {ebfile} requires toolchain {miss} which is too old according to min_toolchains.', flush=True)
+                                doskip = True
+                    if doskip:
+                        self._mark_status(statdict, ebfile, 'skipped', 'dependency requires too old toolchain')
+                        continue
+                    print(f" Downloading previous packages ... ", flush=True)
+                    # getsource = True
+                    # if self.args.skipsources:
+                    #     getsource = False
+                    ebskipped-=1
+                    if time.time()-downloadtime > self.copydelay:
+                        self.download(f':s3:{self.cfg.archivepath}', self.eb_root, s3_prefix) #downloading modules
+                        print(f" Unpacking previous packages ... ", flush=True)
+                        #all_tars, new_tars = self._untar_eb_software(softwaredir)
+                        self.aws.s3_download_untar(self.cfg.bucket, software_pref, softwaredir, self._io_workers)
+                        downloadtime = time.time()
                     else:
-                        print(f'  * running "{cmdline} {ebf}" ... ', flush=True)
-                        ret = subprocess.run(f'{cmdline} {ebf}', shell=True, text=True)
+                        print(f" Skipping download, last download was less than {self.copydelay} seconds ago ... ", flush=True)                
+                                                
+                    ######################### Need to install the dependencies first #############################################
+                    print(f" Installing dependencies for {ebfile} ... ", flush=True)
+                    # Exclude the original package by name, it is not always the last one listed
+                    deps = {mod: ebf for mod, ebf in themissing.items() if os.path.basename(ebf) != ebfile}
+                    built, failed = self._build_deps(deps, statdict, statdict_template, status_key)
+                    bldcnt += len(built)
+                    if failed:
+                        errcnt += len(failed)
+                        errpkg += failed
+                        continue # move to next package if ANY dependency failed
+
+                    ######################### Now install the actual package, with dependencies in case some were missed ##############
+                    print(f" Installing {ebfile} ({ebpath})... ", flush=True)
+                    cmd = ['eb', '--robot', '--umask=002']
+                    if 'CUDA' in ebfile: # CUDA is a special case, we may not have a GPU installed 
+                        cmd.append('--ignore-test-failure')
+                    cmd.append(ebpath)
+                    now2=int(time.time())
+                    print(f'  * running "{" ".join(cmd)}" ... ', flush=True)
+                    ret = subprocess.run(cmd, text=True)
                     retcode = ret.returncode
+                    statdict[ebfile]['returncode'] = int(retcode)
+                    statdict[ebfile]['buildtime'] = int(time.time())-now2                
                     print(f'*** EASYBUILD RETURNCODE: {retcode}', flush=True)
-                    trydate = datetime.datetime.now().astimezone().isoformat()                                        
-                    if ebf not in statdict:
-                        statdict[ebf] = statdict_template                   
-                    statdict[ebf]['returncode'] = int(retcode)
-                    statdict[ebf]['trydate'] = trydate
-                    statdict[ebf]['buildtime'] = int(time.time())-now1
                     if retcode != 0:
-                        depterr = True
-                        print(f'  FAILED DEPENDENCY: EasyConfig {ebf}, trying next one ...', flush=True)
+                        print(f'  FAILED: EasyConfig {ebfile}, trying next one ...', flush=True)
                         errcnt+=1
-                        errpkg.append(ebf)
-                        logpath = self._eb_last_log()
-                        logfile = os.path.basename(logpath)
-                        targetlog = os.path.join(self.eb_root, 'tmp', f'{ebf}-{logfile}')
-                        shutil.copy(logpath, targetlog)                      
-                        statdict[ebf]['status'] = 'error'
-                        statdict[ebf]['reason'] = 'n/a'
-                        statdict[ebf]['errorcount'] += 1
+                        errpkg.append(ebfile)
+                        self._save_log(self._eb_last_log(), ebfile)
+                        themissing2 = self._eb_missing_modules( ebpath, printout=False)                 
+                        #if len(themissing2) == len(themissing):                    
+                        self._mark_status(statdict, ebfile, 'error', 'n/a', modules=themissing2)
+                        #self.aws.s3_put_json(status_key,statdict)
                     else:
-                        print(f'  DEPENDENCY SUCCESS: EasyConfig {ebf} built successfully.', flush=True)
-                        statdict[ebf]['status'] = 'success'
-                        statdict[ebf]['reason'] = 'easyconfig built successfully'
-                        statdict[ebf]['modules'] = None
-                        bldcnt+=1                        
-                    self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
-                    if depterr:
-                        break
-                if depterr:
-                    continue # move to next package if ANY dependency failed
-
-                ######################### Now install the actual package, with dependencies in case some were missed ##############
-                print(f" Installing {ebfile} ({ebpath})... ", flush=True)
-                cmdline = "eb --robot --umask=002"
-                now2=int(time.time())
-                if 'CUDA' in ebfile: # CUDA is a special case, we may not have a GPU installed 
-                    print(f'  * running "{cmdline} --ignore-test-failure {ebpath}" ... ', flush=True)
-                    ret = subprocess.run(f'{cmdline} --ignore-test-failure {ebpath}', shell=True, text=True)
-                else:
-                    print(f'  * running "{cmdline} {ebpath}" ... ', flush=True)
-                    ret = subprocess.run(f'{cmdline} {ebpath}', shell=True, text=True)
-                retcode = ret.returncode
-                statdict[ebfile]['returncode'] = int(retcode)
-                statdict[ebfile]['buildtime'] = int(time.time())-now2                
-                print(f'*** EASYBUILD RETURNCODE: {retcode}', flush=True)
-                if retcode != 0:
-                    print(f'  FAILED: EasyConfig {ebfile}, trying next one ...', flush=True)
-                    errcnt+=1
-                    errpkg.append(ebfile)
-                    logpath = self._eb_last_log()
-                    logfile = os.path.basename(logpath)
-                    targetlog = os.path.join(self.eb_root, 'tmp', f'{ebfile}-{logfile}')
-                    shutil.copy(logpath, targetlog) 
-                    themissing2 = self._eb_missing_modules( ebpath, printout=False)                 
-                    #if len(themissing2) == len(themissing):                    
-                    statdict[ebfile]['status'] = 'error'
-                    statdict[ebfile]['reason'] = 'n/a'
-                    statdict[ebfile]['modules'] = themissing2                
-                    #self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
-                else:
-                    print(f'  SUCCESS: EasyConfig {ebfile} built successfully.', flush=True)
-                    statdict[ebfile]['status'] = 'success'
-                    statdict[ebfile]['reason'] = 'easyconfig built successfully'
-                    statdict[ebfile]['modules'] = None
-                    print(f" Tarring and uploading new packages ... ", flush=True)
-                    all_tars, new_tars = self._tar_eb_software(softwaredir)
-                    if new_tars:
-                        bldcnt+=1
-                        self.upload(self.eb_root, f':s3:{self.cfg.archivepath}', s3_prefix)
-                    else:
-                        print(f'  * No new eb.tar.gz files to upload.', flush=True)
-                self.aws.s3_put_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json',statdict)
-                statdict = self.aws.s3_get_json(f'{self.cfg.archiveroot}/{s3_prefix}/eb-build-status.json')                
-                print(f'  ### UPDATE: {ebcnt} newest easyconfigs (plus dependencies) ({ebskipped} skipped), {bldcnt} packages built, {errcnt} builds failed', flush=True)
+                        print(f'  SUCCESS: EasyConfig {ebfile} built successfully.', flush=True)
+                        self._mark_status(statdict, ebfile, 'success', 'easyconfig built successfully', modules=None)
+                        print(f" Tarring and uploading new packages ... ", flush=True)
+                        all_tars, new_tars = self._tar_eb_software(softwaredir)
+                        if new_tars:
+                            bldcnt+=1
+                            self.upload(self.eb_root, f':s3:{self.cfg.archivepath}', s3_prefix)
+                        else:
+                            print(f'  * No new eb.tar.gz files to upload.', flush=True)
+                    self._maybe_flush_status(statdict, status_key, force=True)
+                    print(f'  ### UPDATE: {ebcnt} newest easyconfigs (plus dependencies) ({ebskipped} skipped), {bldcnt} packages built, {errcnt} builds failed', flush=True)
                                                 
-            except subprocess.CalledProcessError:
-                print(f"  Builder.build_all_eb: A CalledProcessError occurred while building {ebfile}.", flush=True)
-                ## make sure we store the logfile
-                continue
+                except subprocess.CalledProcessError:
+                    print(f"  Builder.build_all_eb: A CalledProcessError occurred while building {ebfile}.", flush=True)
+                    ## make sure we store the logfile
+                    continue
 
-            except Exception as e:
-                print(f"  Builder.build_all_eb: An unexpected error occurred:\n{e}", flush=True)
-                traceback.print_exc()
-                continue
+                except Exception as e:
+                    print(f"  Builder.build_all_eb: An unexpected error occurred:\n{e}", flush=True)
+                    traceback.print_exc()
+                    continue
+        finally:
+            # statdict is only kept in memory during the walk, make sure it is stored
+            self._maybe_flush_status(statdict, status_key, force=True)
         try:
             print(f'  Failed easyconfigs: {", ".join(errpkg)}', flush=True)
             print(f'  BUILD FINISHED. Tried {ebcnt} viable easyconfigs ({ebskipped} skipped), {bldcnt} packages built, {errcnt} builds failed', flush=True)
@@ -791,20 +789,157 @@ class Builder:
             pass
         
         return True
-    
-    def _parse_easyconfig(self, ebfile):
-        """
-        Helper function: find and parse easyconfig with specified filename,
-        and return parsed easyconfig file (an EasyConfig instance).
-        """
-        # determine path to easyconfig file
-        ec_path = det_easyconfig_paths([ebfile])[0]
-        # parse easyconfig file;
-        # the 'parse_easyconfigs' function expects a list of tuples,
-        # where the second item indicates whether or not the easyconfig file was automatically generated or not
-        ec_dicts, _ = parse_easyconfigs([(ec_path, False)])
-        # only retain first parsed easyconfig, ignore any others (which are unlikely anyway)
-        return ec_path, ec_dicts[0]['ec']
+
+    def _process_eb_folder(self, root, statdict):
+        # runs in a worker thread: returns (ebfile, ebpath, ecinfo) for the
+        # newest easyconfig in root, ecinfo is only parsed if we need to build
+        ebfile = self._get_latest_easyconfig(root)
+        if not ebfile:
+            return None, None, None
+        ebpath = os.path.join(root, ebfile)
+        if not os.path.isfile(ebpath):
+            return ebfile, None, None
+        if ebfile in statdict and self._is_eb_done(ebfile, statdict):
+            return ebfile, ebpath, None
+        return ebfile, ebpath, self._read_easyconfig(ebpath)
+
+    def _ec_skip_reason(self, ecinfo, includes, excludes):
+        # returns (message, reason) if min_toolchains, --include or --exclude
+        # rule out the easyconfig described by ecinfo, otherwise None
+        name, version, tc, _, cls, _ = ecinfo
+        sversion = self.cfg.sversion
+        if name in self._mt_parsed: # if this is the toolchain package itself
+            if sversion(version) < self._mt_parsed[name]:
+                return (f'Easyconfig {name} version {version} too old according to min_toolchains.',
+                        f'toolchain version too old: {version}')
+        if tc['name'] not in self._mt_parsed:
+            return (f'Toolchain not supported: {tc["name"]}',
+                    f'toolchain not supported: {tc["name"]}')
+        if sversion(tc['version']) < self._mt_parsed[tc['name']]:
+            return (f'Toolchain version {tc["version"]} of {tc["name"]} too old according to min_toolchains.',
+                    f'toolchain version too old: {tc["name"]}-{tc["version"]}')
+        if includes:
+            if cls not in includes:
+                # we want to may be only build bio packages
+                return (f'{name} is not a module class in --include {",".join(sorted(includes))} ',
+                        'module class not included via --include option')
+        elif excludes:
+            if cls in excludes:
+                return (f'{name} is a module class in --exclude {",".join(sorted(excludes))} ',
+                        'module class excluded via --exclude option')
+        return None
+
+    def _mark_status(self, statdict, ebfile, status, reason, **kwargs):
+        # update an easyconfig entry in memory, _maybe_flush_status writes it to S3
+        statdict[ebfile]['status'] = status
+        statdict[ebfile]['reason'] = reason
+        statdict[ebfile].update(kwargs)
+        self._statdict_dirty = True
+
+    def _maybe_flush_status(self, statdict, status_key, force=False):
+        # write eb-build-status.json if it has changed, but not more often
+        # than every self.statusdelay seconds unless force is set
+        if not self._statdict_dirty:
+            return False
+        if not force and time.monotonic() - self._statdict_last_flush < self.statusdelay:
+            return False
+        self._statdict_last_flush = time.monotonic()
+        if not self.aws.s3_put_json(status_key, statdict):
+            # stay dirty, the next flush writes the whole dict again
+            return False
+        self._statdict_dirty = False
+        return True
+
+    def _is_eb_done(self, ebfile, statdict):
+        # True if ebfile has been tried before and should not be tried again
+        return statdict[ebfile]['status'] != 'skipped' or self.args.checkskipped == False
+
+    def _deps_osdeps(self, deps):
+        # OS dependencies of all easyconfigs in deps {module: easyconfig}
+        osdeps = []
+        for ebf in deps.values():
+            try:
+                _, ec = self._parse_easyconfig(ebf)
+                osdeps += ec.get('osdependencies', []) or []
+            except Exception as e:
+                print(f'  * Could not parse easyconfig {ebf}: {e}', flush=True)
+        return osdeps
+
+    def _build_deps(self, deps, statdict, statdict_template, status_key):
+        # build missing dependencies one after another in the order of 'eb --missing-modules',
+        # all builds install into the shared /opt/eb. Returns lists of built and failed easyconfigs
+        osdeps = self._deps_osdeps(deps)
+        if osdeps:
+            # prints only for packages that are not installed yet
+            self.cfg.install_os_packages(osdeps)
+        built = []; failed = []
+        for ebf in deps.values():
+            print(f"  ------------ {ebf} (Dependency) ------------------------ ... ", flush=True)
+            try:
+                retcode, buildtime, logpath = self._eb_build_dep(ebf)
+            except Exception as e:
+                print(f'  * Error building {ebf}: {e}', flush=True)
+                retcode, buildtime, logpath = -1, 0, ''
+            print(f'*** EASYBUILD RETURNCODE: {retcode} ({ebf})', flush=True)
+            if ebf not in statdict:
+                statdict[ebf] = dict(statdict_template)
+            statdict[ebf]['returncode'] = int(retcode)
+            statdict[ebf]['trydate'] = datetime.datetime.now(_LOCAL_TZ).isoformat()
+            statdict[ebf]['buildtime'] = buildtime
+            if retcode != 0:
+                print(f'  FAILED DEPENDENCY: EasyConfig {ebf}, skipping the remaining ones ...', flush=True)
+                failed.append(ebf)
+                self._save_log(logpath, ebf)
+                self._mark_status(statdict, ebf, 'error', 'n/a')
+                statdict[ebf]['errorcount'] += 1
+            else:
+                print(f'  DEPENDENCY SUCCESS: EasyConfig {ebf} built successfully.', flush=True)
+                self._mark_status(statdict, ebf, 'success', 'easyconfig built successfully', modules=None)
+                built.append(ebf)
+            # a failed log has been linked/copied to eb_root/tmp by _save_log
+            shutil.rmtree(self._dep_logdir(ebf), ignore_errors=True)
+            # debounced, a package with 50 dependencies should not cause 50 PUTs
+            self._maybe_flush_status(statdict, status_key)
+            if failed:
+                break # later dependencies may need the one that failed
+        self._maybe_flush_status(statdict, status_key, force=True)
+        return built, failed
+
+    def _eb_build_dep(self, ebf):
+        # builds one dependency, returns (returncode, buildtime, logpath), the build
+        # gets its own log folder so the failed log is found without 'eb --last-log'
+        logdir = self._dep_logdir(ebf)
+        os.makedirs(logdir, exist_ok=True)
+        cmd = ['eb', '--umask=002', f'--tmp-logdir={logdir}']
+        if 'CUDA' in ebf: # CUDA is a special case, we may not have a GPU installed 
+            cmd.append('--ignore-test-failure')
+        cmd.append(ebf)
+        print(f'  * running "{" ".join(cmd)}" ... ', flush=True)
+        now1 = int(time.time())
+        ret = subprocess.run(cmd, text=True)
+        logpath = ''
+        if ret.returncode != 0:
+            logs = glob.glob(os.path.join(logdir, '*.log'))
+            logpath = max(logs, key=os.path.getmtime) if logs else self._eb_last_log()
+        return ret.returncode, int(time.time())-now1, logpath
+
+    def _dep_logdir(self, ebf):
+        # per build log folder of _eb_build_dep, removed once the build is recorded
+        return os.path.join(self.eb_root, 'tmp', 'deplogs', ebf)
+
+    def _save_log(self, logpath, ebfile):
+        # keep the log of a failed build in eb_root/tmp, a hard link avoids 
+        # copying multi-MB logs if both are on the same filesystem
+        if not logpath or not os.path.isfile(logpath):
+            return None
+        targetlog = os.path.join(self.eb_root, 'tmp', f'{ebfile}-{os.path.basename(logpath)}')
+        try:
+            if os.path.exists(targetlog):
+                os.remove(targetlog)
+            os.link(logpath, targetlog)
+        except OSError:
+            shutil.copyfile(logpath, targetlog)
+        return targetlog
 
     def _eb_last_log(self):
         command = ['eb', '--last-log']
@@ -817,24 +952,16 @@ class Builder:
     def _eb_missing_modules(self, eb_file, printout=False):
         command = ['eb', '--missing-modules', eb_file]
         try:
-            output = subprocess.check_output(command, text=True)
+            output = subprocess.check_output(command)
         except subprocess.CalledProcessError as e:
             print(f"Error executing command: {e}")
             return {'error': 1}
         # Print raw output if the option is enabled
         if printout:
             print("Raw output of 'eb --missing-modules':")
-            print(output)
-        # Pattern to match lines starting with '* ' and capturing the module and easyconfig
-        pattern = re.compile(r'\* (\S+) \((\S+\.eb)\)')
-        # Parse the output
-        modules = {}
-        for line in output.splitlines():
-            match = pattern.match(line)
-            if match:
-                module, easyconfig = match.groups()
-                modules[module] = easyconfig
-        return modules
+            print(output.decode(errors='replace'))
+        # scan the raw bytes once, only the matches are decoded
+        return {m.group(1).decode(): m.group(2).decode() for m in self._MISSING_RE.finditer(output)}
 
     def _errors_in_missing(self, themissing, statdict):
         #returns a list of easyconfigs that have had build errors
@@ -883,157 +1010,101 @@ class Builder:
     def _tar_eb_software(self, folder):
         new_tars = []
         all_tars = []
-        for root, dirs, files in self.cfg._walker(folder):
-            # Check if 'easybuild' is in the directories
-            if 'easybuild' in dirs:
-                # Extract the folder name which should be the version, and the parent folder which should be the package
-                version_dir = os.path.basename(root)
-                if version_dir == 'site-packages' or version_dir == 'lib' or version_dir == 'sandbox':
-                    continue
-                if not glob.glob(os.path.join(root,'easybuild', "*.log")):
-                    continue
+        jobs = []
+        for package_root, package_dir, version_dir in self._eb_install_dirs(folder):
+            # package_root is already <folder>/<package_dir>, plain concat is enough
+            root = f'{package_root}/{version_dir}'
+            if not glob.glob(os.path.join(root,'easybuild', "*.log")):
+                continue
 
-                package_dir = os.path.basename(os.path.dirname(root))
-                package_root = os.path.dirname(root)
+            # Create the tarball name
+            tarball_name = f'{package_dir}-{version_dir}.eb.tar.gz'
+            tarball_path = f'{package_root}/{tarball_name}'
 
-                # Create the tarball name
-                tarball_name = f'{package_dir}-{version_dir}.eb.tar.gz'
-                tarball_path = os.path.join(folder, package_dir, tarball_name)
+            if self.args.debug:
+                self.cfg.printdbg(f'version_dir: {version_dir}, package_dir: {package_dir}, package_root: {package_root}, tarball_name: {tarball_name}, tarball_path: {tarball_path}')   
+            
+            if os.path.exists(f'{tarball_path}.stub'):
+                print(f'  {tarball_path} was previously downloaded, skipping ...')
+                continue
 
+            all_tars.append(tarball_path)
+            if os.path.isfile(tarball_path):
                 if self.args.debug:
-                    self.cfg.printdbg(f'version_dir: {version_dir}, package_dir: {package_dir}, package_root: {package_root}, tarball_name: {tarball_name}, tarball_path: {tarball_path}')   
-                
-                if os.path.exists(f'{tarball_path}.stub'):
-                    print(f'  {tarball_path} was previously downloaded, skipping ...')
-                    continue
-
-                all_tars.append(tarball_path)
-                if os.path.isfile(tarball_path):
-                    if self.args.debug:
-                        self.cfg.printdbg(f'Tarball {tarball_path} already exists ...')   
-                    continue
-                new_tars.append(tarball_path)
-
-                # Print info for the user
-                print(f"Creating tarball {tarball_path} from {root}...", flush=True)
-
-                # Use tar with pigz for compression
+                    self.cfg.printdbg(f'Tarball {tarball_path} already exists ...')   
+                continue
+            jobs.append((package_root, version_dir, tarball_path))
+
+        # most packages are too small to keep pigz busy on all cores, so run 
+        # several tar jobs at the same time and split the cores between them
+        workers = max(1, self.args.vcpus // 4)
+        threads = max(1, self.args.vcpus // workers)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self._tar_one, package_root, version_dir, tarball_path, threads): tarball_path 
+                       for package_root, version_dir, tarball_path in jobs}
+            for future in concurrent.futures.as_completed(futures):
                 try:
-                    subprocess.run([
-                        "tar",
-                        "-I", f"pigz -p {self.args.vcpus}",  # Call pigz for compression with X CPUs
-                        "-cf", f'{tarball_path}.tmp',  # Create and verbosely list files processed
-                        "-C", package_root,  # Change to the parent directory of version
-                        version_dir  # Specify the directory to compress
-                    ], check=True)
-                    os.rename(f'{tarball_path}.tmp', tarball_path)
-                    print(f"Successfully created tarball: {tarball_path}")
-                except subprocess.CalledProcessError as e:
-                    print(f"An error occurred while creating tarball: {e}")
+                    if future.result():
+                        new_tars.append(futures[future])
+                except Exception as e:
+                    print(f"An error occurred while creating tarball {futures[future]}: {e}")
         return all_tars, new_tars
+
+    def _eb_install_dirs(self, folder):
+        # EasyBuild installs into software/<package>/<version>, only look at that 
+        # level instead of walking every file of every installed package
+        for pkg in self._scandirs(folder):
+            for ver in self._scandirs(pkg.path):
+                if ver.name not in ('site-packages', 'lib', 'sandbox') and \
+                        os.path.isdir(os.path.join(ver.path, 'easybuild')):
+                    yield pkg.path, pkg.name, ver.name
+
+    def _scandirs(self, path):
+        # sub directories of path, not following symlinks
+        try:
+            with os.scandir(path) as it:
+                return [e for e in it if e.is_dir(follow_symlinks=False)]
+        except OSError as e:
+            self.cfg._walkerr(e)
+            return []
+
+    def _tar_one(self, package_root, version_dir, tarball_path, threads):
+        # Print info for the user
+        print(f"Creating tarball {tarball_path} from {os.path.join(package_root, version_dir)}...", flush=True)
+        # Use tar with pigz for compression, returns True if the tarball was created
+        try:
+            subprocess.run([
+                "tar",
+                "-I", f"pigz -p {threads}",  # Call pigz for compression with X CPUs
+                "-cf", f'{tarball_path}.tmp',  # Create and verbosely list files processed
+                "-C", package_root,  # Change to the parent directory of version
+                version_dir  # Specify the directory to compress
+            ], check=True)
+            os.rename(f'{tarball_path}.tmp', tarball_path)
+            print(f"Successfully created tarball: {tarball_path}")
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"An error occurred while creating tarball: {e}")
+            return False
     
     def _untar_eb_software(self, folder):
-        from concurrent.futures import ThreadPoolExecutor, as_completed
+        # unpack all local *.eb.tar.gz below folder with the untar helper (see untar.go)
         new_tars = []
         all_tars = []
-
-        subprocess.run(['untar', folder, self.args.vcpus*100])
-        return all_tars, new_tars
-
-        def untar_file(file_path, root):
-            print(f"Unpacking {file_path} into {root}...", flush=True)
-            try:
-                # # Check if pigz is available
-                # if shutil.which("pigz"):
-                #     decompress_command = f"pigz -p {self.args.vcpus}"
-                # else:
-                #     # Fallback to gzip if pigz is not available
-                #     decompress_command = "gzip -d"
-
-                # # Decompress and unpack the file
-                # subprocess.run([
-                #     "tar",
-                # #    "-I", decompress_command,
-                #     "-xf", file_path,
-                #     "-C", root 
-                # ], check=True)
-                with tarfile.open(file_path, 'r:gz') as tar:
-                    tar.extractall(path=root)
-                print(f"Successfully unpacked: {file_path}")
-                return file_path            
-            #except subprocess.CalledProcessError as e:
-            except tarfile.TarError as e:            
-                print(f"untar_file: An error occurred while unpacking {file_path}: {e}")
-                return False
-            except Exception as e:
-                print(f"untar_file: An error occurred while unpacking {file_path}: {e}")
-                return False
-
-        # Create a list of tasks for parallel execution
-        tasks = []
-        for root, dirs, files in self.cfg._walker(folder):
-            package_name = os.path.basename(root)
-            for filename in files:
-                if filename.endswith('.eb.tar.gz'):
-                    version = filename.replace('.eb.tar.gz', '').replace(package_name + '-', '')
-                    version_dir_path = os.path.join(root, version)
-                    easybuild_path = os.path.join(version_dir_path, 'easybuild')
-                    file_path = os.path.join(root, filename)
-                    all_tars.append(file_path)
-                    if not os.path.exists(easybuild_path):
-                        tasks.append((file_path, root))
-
-        # Execute the tasks in parallel using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=self.args.vcpus*100) as executor:
-            future_to_file = {executor.submit(untar_file, file_path, root): file_path for file_path, root in tasks}
-            for future in as_completed(future_to_file):
-                file_path = future_to_file[future]
-                try:
-                    unpacked_file = future.result()
-                    if unpacked_file:
-                        new_tars.append(unpacked_file)
-                except Exception as e:
-                    print(f"An error occurred while executing task for {file_path}: {e}")
-
+        subprocess.run(['untar', folder, str(self._io_workers)])
         return all_tars, new_tars
 
-
     def _get_latest_easyconfig(self,directory):
-         
-        version_file_dict = {}
-        version_pattern = re.compile(r'-(\d+(?:\.\d+)*)(?:-(\w+(?:-\d+(?:\.\d+)*(?:[ab]\d+)?)?))?\.')
-
-        for filename in os.listdir(directory):
-            if not filename.endswith('.eb'):
-                continue            
-            match = version_pattern.search(filename)
-            if match:
-                software_version = match.group(1)
-                toolchain_version = match.group(2) if match.group(2) else '0'  # Default to '0' if no toolchain
-                # Attempt to parse the toolchain version as a semantic version
-                try:
-                    toolchain_version_parsed = parse(toolchain_version)
-                except InvalidVersion:
-                    # If it's not a valid semantic version, we will use the string itself for comparison
-                    toolchain_version_parsed = toolchain_version
-                
-                version_tuple = (parse(software_version), toolchain_version_parsed)
-                version_file_dict[version_tuple] = filename
-        
-        if not version_file_dict:
-            return None
-
-        # Sort by software version and then toolchain version
-        # Custom sort to handle non-standard version strings
-        def sort_key(version_tuple):
-            software, toolchain = version_tuple
-            if isinstance(toolchain, str):
-                # Assume non-standard versions are older, set them as the minimum
-                return software, parse('0')
-            return software, toolchain
-
-        latest_version = sorted(version_file_dict.keys(), key=sort_key, reverse=True)[0]
-        return version_file_dict[latest_version]
+        # single pass over the .eb files, newest software then toolchain version
+        best = None; best_key = None
+        with os.scandir(directory) as it:
+            for entry in it:
+                if not entry.name.endswith('.eb'):
+                    continue
+                key = _eb_version_key(entry.name)
+                if key is not None and (best_key is None or key > best_key):
+                    best, best_key = entry.name, key
+        return best
 
     def _read_easyconfig(self, ebpath):
         
@@ -1068,17 +1139,26 @@ class Builder:
         """
         try:
             # determine path to easyconfig file
-            ec_path = det_easyconfig_paths([ebfile])[0]
-            # parse easyconfig file;
-            # the 'parse_easyconfigs' function expects a list of tuples,
-            # where the second item indicates whether or not the easyconfig file was automatically generated or not
-            ec_dicts, _ = parse_easyconfigs([(ec_path, False)])
-            # only retain first parsed easyconfig, ignore any others (which are unlikely anyway)
-            return ec_path, ec_dicts[0]['ec']
+            ec_path = self._find_easyconfig(ebfile)
+            # the same dependencies show up for many packages, only parse them again if the file changed
+            return ec_path, self._parse_easyconfig_path(ec_path, os.stat(ec_path).st_mtime)
         except EasyBuildError as e:
             print("Error in _parse_easyconfig:", e)
             return None, None
 
+    @functools.lru_cache(maxsize=4096)
+    def _find_easyconfig(self, ebfile):
+        return det_easyconfig_paths([ebfile])[0]
+
+    @functools.lru_cache(maxsize=4096)
+    def _parse_easyconfig_path(self, ec_path, mtime):
+        # mtime is only part of the cache key, the returned EasyConfig is shared, do not modify it
+        # the 'parse_easyconfigs' function expects a list of tuples,
+        # where the second item indicates whether or not the easyconfig file was automatically generated or not
+        ec_dicts, _ = parse_easyconfigs([(ec_path, False)])
+        # only retain first parsed easyconfig, ignore any others (which are unlikely anyway)
+        return ec_dicts[0]['ec']
+
     def upload(self, source, target, s3_prefix):
 
         source = os.path.abspath(source)
@@ -1088,13 +1168,6 @@ class Builder:
         # optional '--s3-acl', 'authenticated-read' does not seem to be required
 
         if not self.rclone_upload_compare == '--size-only':
-            print ('  Uploading Bootstrap output ... ', flush=True)
-            ret = rclone.copy(os.path.expanduser('~/'),
-                            f'{target}/{s3_prefix}/logs/',
-                            '--include', 'out.bootstrap.*'
-                            )
-            self._transfer_status(ret)   
-
             print ('  Uploading Sources ... ', flush=True)
             ret = rclone.copy(os.path.join(source,'sources'),
                             f'{target}/sources/', 
@@ -1103,31 +1176,32 @@ class Builder:
                             )
             self._transfer_status(ret)
 
-        print ('  Uploading Modules ... ', flush=True)
-        ret = rclone.copy(os.path.join(source,'modules'),
-                          f'{target}/{s3_prefix}/modules/', 
-                          '--links', '--fast-list', '--s3-no-head',
-                            self.rclone_upload_compare
-                        )
-        self._transfer_status(ret)
-
-
-        print ('  Uploading Software ... ', flush=True)
-        ret = rclone.copy(os.path.join(source,'software'),
-                          f'{target}/{s3_prefix}/software/', 
+        # modules and software keep their folder names below s3_prefix, 
+        # one rclone run with include filters lists the target only once
+        print ('  Uploading Modules and Software ... ', flush=True)
+        ret = rclone.copy(source,
+                          f'{target}/{s3_prefix}/', 
                           '--links', '--fast-list', '--s3-no-head',
                             self.rclone_upload_compare, 
-                          '--include', '*.eb.tar.gz'
+                          '--include', '/modules/**',
+                          '--include', '/software/**.eb.tar.gz'
                         )
         self._transfer_status(ret)
         
-        print ('  Uploading EB output ... ', flush=True)
-        ret = rclone.copy(os.path.expanduser('~/'),
+        print ('  Uploading Bootstrap and EB output ... ', flush=True)
+        # the logs are top level files in ~, name them instead of letting 
+        # rclone walk the whole home directory with an include filter
+        home = os.path.expanduser('~')
+        patterns = ['out.easybuild.*']
+        if not self.rclone_upload_compare == '--size-only':
+            patterns.append('out.bootstrap.*')
+        logfiles = [os.path.basename(f) for pat in patterns for f in glob.glob(os.path.join(home, pat))]
+        ret = rclone.copy_batch(home, logfiles,
                           f'{target}/{s3_prefix}/logs/',
-                           '--fast-list', '--s3-no-head',
-                            self.rclone_upload_compare,
-                          '--include', 'out.easybuild.*'
+                           '--s3-no-head',
+                            self.rclone_upload_compare
                         )
+        self._transfer_status(ret)
 
         print ('  Uploading failed logs ... ', flush=True)
         ret = rclone.copy(os.path.join(source,'tmp'),
@@ -1211,13 +1285,21 @@ class Builder:
             print(f'   Rclone copy: {ttransfers} file(s) with {total} transferred.')
         
     def _make_files_executable(self, path):
-        for root, dirs, files in self.cfg._walker(path):
-            for file in files:
-                if not file.endswith('.tar.gz'):
-                    file_path = os.path.join(root, file)
-                    if not os.access(file_path, os.X_OK):
-                        print(f'Making {file_path} executable')
-                        os.chmod(file_path, os.stat(file_path).st_mode | 0o111)
+        # one scandir pass, DirEntry.stat() is usually free and chmod only runs if needed
+        stack = [path]
+        while stack:
+            try:
+                with os.scandir(stack.pop()) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False) and not entry.name.endswith('.tar.gz'):
+                            mode = entry.stat(follow_symlinks=False).st_mode
+                            if not mode & 0o100:
+                                print(f'Making {entry.path} executable')
+                                os.chmod(entry.path, mode | 0o111)
+            except OSError as e:
+                print(f'  Error in _make_files_executable: {e}')
 
     def test_write(self, directory):
         testpath=os.path.join(directory,'.aws-eb.test')
@@ -1245,18 +1327,25 @@ class Builder:
     def _convert_size(self, size_bytes):
         if size_bytes == 0:
             return "0B"
-        size_name = ("B", "KiB", "MiB", "GiB", "TiB", "PiB", "EiB")
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
+        # exact integer log1024, no float rounding near powers of 1024
+        i = min((int(size_bytes).bit_length()-1)//10, len(_SIZE_NAMES)-1)
+        p = 1 << (10*i)
         s = round(size_bytes/p, 3)
-        return f"{s} {size_name[i]}"    
+        return f"{s} {_SIZE_NAMES[i]}"    
              
 
 class Rclone:
+    # mount point (2nd field) of rclone fuse mounts in /proc/mounts
+    _RCLONE_MOUNT_RE = re.compile(rb'^\S+ (\S+) fuse\.rclone', re.MULTILINE)
+
     def __init__(self, args, cfg):
         self.args = args
         self.cfg = cfg
         self.rc = os.path.join(self.cfg.binfolderx,'rclone')
+        self._bk_procs = {} # pid -> Popen of background processes such as mounts
+        self._mounts_blob = b''; self._mounts_time = float('-inf')
+        self._tuning = {} # backend -> (transfers, checkers), see _record_throughput
+        self._speeds = {} # (backend, size class) -> speed of the last copy
 
     # ensure that file exists or nagging /home/dp/.config/rclone/rclone.conf
 
@@ -1272,43 +1361,90 @@ class Rclone:
 
     def _run_rc(self, command):
 
-        command = self._add_opt(command, '--verbose')
-        command = self._add_opt(command, '--use-json-log')
-        command = self._add_opt(command, '--transfers', str(self.args.vcpus*2))
-        command = self._add_opt(command, '--checkers', str(self.args.vcpus*2))
+        backend = 's3' if any(c.startswith(':s3:') for c in command) else 'local'
+        transfers, checkers = self._tune_concurrency(backend)
+        extras = {'--use-json-log': None}
+        if self.args.debug:
+            extras['--verbose'] = None
+        else:
+            # a line per file is only useful for debugging, without --verbose 
+            # the stats are still logged as JSON at NOTICE level 
+            extras.update({'--stats-log-level': 'NOTICE', '--stats-one-line': None, '--stats': '10s'})
+        extras.update({'--transfers': str(transfers), '--checkers': str(checkers)})
+        command = self._build_cmd(command, extras)
 
         self.cfg.printdbg('Rclone command:', " ".join(command))
         try:
-            ret = subprocess.run(command, capture_output=True, text=True, env=self.cfg.envrn)
-            if ret.returncode != 0:
-                #pass
-                sys.stderr.write(f'*** Error, Rclone return code > 0:\n{ret.stderr} Command:\n{" ".join(command)}\n\n')
-                # list of exit codes 
-                # 0 - success
-                # 1 - Syntax or usage error
-                # 2 - Error not otherwise categorised
-                # 3 - Directory not found
-                # 4 - File not found
-                # 5 - Temporary error (one that more retries might fix) (Retry errors)
-                # 6 - Less serious errors (like 461 errors from dropbox) (NoRetry errors)
-                # 7 - Fatal error (one that more retries won't fix, like account suspended) (Fatal errors)
-                # 8 - Transfer exceeded - limit set by --max-transfer reached
-                # 9 - Operation successful, but no files transferred
-            
-            #lines = ret.stderr.decode('utf-8').splitlines() #needed if you do not use ,text=True
-            #locked_dirs = '\n'.join([l for l in lines if "Locked Dir:" in l]) 
-            #print("   STDOUT:",ret.stdout)
-            #print("   STDERR:",ret.stderr)
-            #rclone mount --daemon
-            return ret.stdout.strip(), ret.stderr.strip()
-
+            # parse stderr while rclone runs and only keep the latest stats object
+            # and the last lines for error messages instead of the whole verbose log
+            proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
+                                    text=True, env=self.cfg.envrn)
+            stats = None
+            tail = collections.deque(maxlen=50)
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                f_out = executor.submit(proc.stdout.read)
+                for line in proc.stderr:
+                    tail.append(line)
+                    stats = self._parse_stats_line(line) or stats
+                out = f_out.result()
+            proc.wait()
         except Exception as e:
             print (f'Rclone Error: {str(e)}')
-            return None, str(e)
+            return None, None
+
+        if command[1] == 'copy':
+            self._record_throughput(backend, transfers, checkers, stats, proc.returncode)
+        if proc.returncode != 0:
+            #pass
+            sys.stderr.write(f'*** Error, Rclone return code > 0:\n{"".join(tail)} Command:\n{" ".join(command)}\n\n')
+            # list of exit codes 
+            # 0 - success
+            # 1 - Syntax or usage error
+            # 2 - Error not otherwise categorised
+            # 3 - Directory not found
+            # 4 - File not found
+            # 5 - Temporary error (one that more retries might fix) (Retry errors)
+            # 6 - Less serious errors (like 461 errors from dropbox) (NoRetry errors)
+            # 7 - Fatal error (one that more retries won't fix, like account suspended) (Fatal errors)
+            # 8 - Transfer exceeded - limit set by --max-transfer reached
+            # 9 - Operation successful, but no files transferred
+        
+        #lines = ret.stderr.decode('utf-8').splitlines() #needed if you do not use ,text=True
+        #locked_dirs = '\n'.join([l for l in lines if "Locked Dir:" in l]) 
+        #print("   STDOUT:",ret.stdout)
+        #print("   STDERR:",ret.stderr)
+        #rclone mount --daemon
+        return out.strip(), stats
+
+    def _tune_concurrency(self, backend):
+        # (transfers, checkers) for a backend, adapted after each copy by _record_throughput
+        if backend in self._tuning:
+            return self._tuning[backend]
+        transfers = max(16, self.args.vcpus*2)
+        return transfers, transfers*2
+
+    def _record_throughput(self, backend, transfers, checkers, stats, returncode):
+        # AIMD like ramp: more parallel transfers while the speed keeps improving,
+        # half as many after errors or when the speed drops. The state only lives 
+        # in this process and speeds are only compared between copies of a similar 
+        # size (within a factor of 16), copies under 64 MiB are ignored
+        st = stats.get('stats', {}) if stats else {}
+        nbytes = st.get('bytes', 0)
+        failed = bool(st.get('errors')) or returncode in (3, 5)
+        if nbytes < 64*1024*1024 and not failed:
+            return
+        sizekey = (backend, int(nbytes).bit_length()//4)
+        speed = st.get('speed', 0)
+        last_speed = self._speeds.get(sizekey)
+        if failed or (last_speed and speed < last_speed*0.9):
+            transfers, checkers = max(4, transfers//2), max(8, checkers//2)
+        elif last_speed and speed > last_speed*1.1:
+            transfers, checkers = min(256, int(transfers*1.5)), min(512, int(checkers*1.5))
+        if not failed:
+            self._speeds[sizekey] = speed
+        self._tuning[backend] = (transfers, checkers)
 
     def _run_bk(self, command):
-        #command = self._add_opt(command, '--verbose')
-        #command = self._add_opt(command, '--use-json-log')
         cmdline=" ".join(command)
         self.cfg.printdbg('Rclone command:', cmdline)
         try:
@@ -1317,11 +1453,38 @@ class Rclone:
             #_, stderr = ret.communicate(timeout=3)  # This does not work with rclone
             if ret.stderr:
                 sys.stderr.write(f'*** Error in command "{cmdline}":\n {ret.stderr} ')
+            self._bk_procs[ret.pid] = ret
             return ret.pid
         except Exception as e:
             print (f'Rclone Error: {str(e)}')
             return None
 
+    def wait_bk(self, pid, timeout=None):
+        # wait for a background process to exit without polling, returns True if it is gone
+        proc = self._bk_procs.get(pid)
+        if hasattr(os, 'pidfd_open'):
+            try:
+                fd = os.pidfd_open(pid)
+            except ProcessLookupError:
+                if proc: proc.poll() # reap it
+                return True
+            try:
+                with selectors.DefaultSelector() as sel:
+                    sel.register(fd, selectors.EVENT_READ)
+                    if not sel.select(timeout):
+                        return False
+            finally:
+                os.close(fd)
+            if proc: proc.wait()
+            return True
+        if proc:
+            try:
+                proc.wait(timeout)
+                return True
+            except subprocess.TimeoutExpired:
+                return False
+        return False
+
     def copy(self, src, dst, *args):
         if src.startswith('/') and not os.path.exists(src):
             print(f'Rclone Info: Source folder {src} does not exist, skipping.')
@@ -1329,18 +1492,23 @@ class Rclone:
         command = [self.rc, 'copy'] + list(args)
         command.append(src)  #command.append(f'{src}/')
         command.append(dst)
-        out, err = self._run_rc(command)
+        out, stats = self._run_rc(command)
         if out:
             print(f'rclone copy output: {out}')
-        #print('ret', err)
-        stats, ops = self._parse_log(err) 
-        if stats:
-            return stats[-1] # return the stats
-        else:
-            return []
+        return stats if stats else [] # return the last stats
     
         #b'{"level":"warning","msg":"Time may be set wrong - time from \\"posix-dp.s3.us-west-2.amazonaws.com\\" is -9m17.550965814s different from this computer","source":"fshttp/http.go:200","time":"2023-04-16T14:40:47.44907-07:00"}'    
 
+    def copy_batch(self, src, rel_paths, dst, *args):
+        # copy many files below src with a single rclone run, --files-from 
+        # means rclone neither walks src nor lists dst for anything else
+        if not rel_paths:
+            return []
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.txt') as tmp:
+            tmp.write('\n'.join(rel_paths) + '\n')
+            tmp.flush()
+            return self.copy(src, dst, '--files-from', tmp.name, '--no-traverse', *args)
+
     def checksum(self, md5file, dst, *args):
         #checksum md5 ./tests/.aws-eb.md5sum
         command = [self.rc, 'checksum'] + list(args)
@@ -1348,15 +1516,10 @@ class Rclone:
         command.append(md5file)
         command.append(dst)
         #print("Command:", command)
-        out, err = self._run_rc(command)
+        out, stats = self._run_rc(command)
         if out:
             print(f'rclone checksum output: {out}')
-        #print('ret', err)
-        stats, ops = self._parse_log(err) 
-        if stats:
-            return stats[-1] # return the stats
-        else:
-            return []
+        return stats if stats else [] # return the last stats
 
     def mount(self, url, mountpoint, *args):
         if not shutil.which('fusermount3'):
@@ -1390,14 +1553,18 @@ class Rclone:
                 cmd = ['fusermount3', '-u', mountpoint]
                 ret = subprocess.run(cmd, capture_output=False, text=True, env=self.cfg.envrn)
             else:
-                rclone_pids = self._get_pids('rclone')
-                fld_pids = self._get_pids(mountpoint, True)
-                common_pids = [value for value in rclone_pids if value in fld_pids]
+                # mounts started by this object are known, only search for others
+                common_pids = [pid for pid, proc in self._bk_procs.items() 
+                               if proc.poll() is None and mountpoint in proc.args]
+                if not common_pids:
+                    rclone_pids = self._get_pids('rclone')
+                    fld_pids = self._get_pids(mountpoint, True)
+                    common_pids = [value for value in rclone_pids if value in fld_pids]
                 for pid in common_pids:
                     try:
                         os.kill(pid, signal.SIGTERM)
                         if wait:
-                            _, _ = os.waitpid(int(pid), 0)
+                            self.wait_bk(int(pid))
                         return True
                     except PermissionError:
                         print(f'Permission denied when trying to send signal SIGTERM to rclone process with PID {pid}.')
@@ -1411,58 +1578,66 @@ class Rclone:
         return self._run_rc(command)
 
     def get_mounts(self):
-        mounts = []
-        with open('/proc/mounts', 'r') as f:
-            for line in f:
-                parts = line.split()
-                mount_point, fs_type = parts[1], parts[2]
-                if fs_type.startswith('fuse.rclone'):
-                    mounts.append(mount_point)
-        return mounts
+        return [m.decode() for m in self._RCLONE_MOUNT_RE.findall(self._read_mounts_bytes())]
+
+    def _read_mounts_bytes(self):
+        # /proc/mounts as bytes, reused for 0.5s to coalesce bursts of mount checks
+        now = time.monotonic()
+        if now - self._mounts_time > 0.5:
+            with open('/proc/mounts', 'rb') as f:
+                self._mounts_blob = f.read()
+            self._mounts_time = now
+        return self._mounts_blob
 
     def _get_pids(self, process, full=False):
-        process = process.rstrip(os.path.sep)
-        if full:
-            command = ['pgrep', '-f', process]
-        else:
-            command = ['pgrep', process]
-        try:
-            output = subprocess.check_output(command)
-            pids = [int(pid) for pid in output.decode().split('\n') if pid]
-            return pids
-        except subprocess.CalledProcessError:
-            # No rclone processes found
-            return []
+        # like 'pgrep [-f] process' but reading /proc directly instead of forking pgrep, 
+        # matches the process name or, with full=True, the whole command line
+        needle = os.fsencode(process.rstrip(os.path.sep))
+        fname = 'cmdline' if full else 'comm'
+        mypid = os.getpid()
+        pids = []
+        for entry in os.scandir('/proc'):
+            if not entry.name.isdigit() or int(entry.name) == mypid:
+                continue
+            try:
+                with open(f'/proc/{entry.name}/{fname}', 'rb') as f:
+                    data = f.read()
+            except OSError:
+                # the process exited in the meantime
+                continue
+            if full:
+                data = data.replace(b'\0', b' ')
+            if needle in data:
+                pids.append(int(entry.name))
+        return pids
 
     def _is_mounted(self, folder_path):
         folder_path = os.path.realpath(folder_path)  # Resolve any symbolic links
-        with open('/proc/mounts', 'r') as f:
-            for line in f:
-                parts = line.split()
-                mount_point, fs_type = parts[1], parts[2]
-                if mount_point == folder_path and fs_type.startswith('fuse.rclone'):
-                    return True
-
-
-    def _add_opt(self, cmd, option, value=None):
-        if option in cmd:
-            return cmd
-        cmd.append(option)
-        if value:
-            cmd.append(value)
+        return b' ' + os.fsencode(folder_path) + b' fuse.rclone' in self._read_mounts_bytes()
+
+
+    def _build_cmd(self, cmd, extras):
+        # append the options in dict extras (option: value or None) that 
+        # are not yet in cmd, one pass over cmd instead of one per option
+        present = {c.split('=', 1)[0] for c in cmd if c.startswith('-')}
+        for option, value in extras.items():
+            if option in present:
+                continue
+            cmd.append(option)
+            if value:
+                cmd.append(value)
         return cmd
-    
-    def _parse_log(self, strstderr):
-        lines=strstderr.split('\n')
-        data = [json.loads(line.rstrip()) for line in lines if line[0] == "{"]
-        stats = []
-        operations = []
-        for obj in data:
-            if 'accounting/stats' in obj['source']:
-                stats.append(obj)
-            elif 'operations/operations' in obj['source']:
-                operations.append(obj)
-        return stats, operations
+
+    def _parse_stats_line(self, line):
+        # returns the stats object of an 'accounting/stats' JSON log line, None otherwise
+        # the substring test is much cheaper than json.loads on every line of a verbose log
+        if not line.startswith('{') or 'accounting/stats' not in line:
+            return None
+        try:
+            obj = json.loads(line)
+        except ValueError:
+            return None
+        return obj if 'accounting/stats' in obj.get('source', '') else None
 
         # stats":{"bytes":0,"checks":0,"deletedDirs":0,"deletes":0,"elapsedTime":4.121489785,"errors":12,"eta":null,"fatalError":false,
         # "lastError":"failed to open source object: Object in GLACIER, restore first: bucket=\"posix-dp\", key=\"tests4/table_example.py\"",
@@ -1530,14 +1705,75 @@ class AWSBoto:
             "fpga": 'f1',
             "u30": 'vt1'            
         }
-
-        try:
-            import boto3
-        except:
-            print('Error: boto3 package not found. Install it first, please run:')
-            print('python3 -m pip install --user --upgrade boto3')
-            sys.exit(1)
-        self.awssession = boto3.Session(profile_name=self.awsprofile) 
+        # reverse lookup instance family -> cpu type, the first cpu type listing a family wins
+        self._family_to_cputype = {}
+        for cputype, families in self.cpu_types.items():
+            for fam in families:
+                self._family_to_cputype.setdefault(fam, cputype)
+
+        # boto3 clients are thread safe and expensive to build, keep one 
+        # per service/profile/region, sessions are not thread safe 
+        self._sessions = {}
+        self._clients = {}
+        self._resources = {}
+        self._clients_lock = threading.Lock()
+        self._identity = None
+        self._s3_sizes = {}
+
+    @functools.cached_property
+    def awssession(self):
+        return self._session(self.awsprofile)
+
+    @functools.cached_property
+    def _boto_cfg(self):
+        # the default pool of 10 connections would throttle the 32-64 worker 
+        # threads of s3_duplicate_bucket and s3_download_untar, adaptive retries 
+        # back off on SlowDown/503 throttling for all clients, no retry loops of our own
+        _import_boto3()
+        from botocore.config import Config
+        return Config(max_pool_connections=128, tcp_keepalive=True, connect_timeout=10,
+                      read_timeout=60, retries={'mode': 'adaptive', 'max_attempts': 10})
+
+    @functools.cached_property
+    def _copy_cfg(self):
+        # s3.copy is used for objects > 5 GiB only (smaller ones use a single 
+        # CopyObject), it copies server side with multipart UploadPartCopy, 
+        # 512 MiB parts keep the number of part requests low
+        _import_boto3()
+        return TransferConfig(multipart_threshold=5*1024**3, multipart_chunksize=512*1024**2,
+                              max_concurrency=8, use_threads=True)
+
+    def _session(self, profile=None, fresh=False):
+        # boto3 session of a profile, profile None is the default session,
+        # fresh=True bypasses the cache, e.g. to pick up edited credentials
+        session = None if fresh else self._sessions.get(profile)
+        if session is None:
+            _import_boto3()
+            session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+            if not fresh:
+                self._sessions[profile] = session
+        return session
+
+    def _resource(self, service, profile=None):
+        # cached boto3 resource, unlike clients resources are not thread safe,
+        # only use them from the main thread
+        key = (service, profile)
+        if key not in self._resources:
+            self._resources[key] = self._session(profile).resource(service, config=self._boto_cfg)
+        return self._resources[key]
+
+    def _client(self, service, profile=None, region=None, endpoint_url=None):
+        # return a cached boto3 client, profile None is the default session
+        key = (service, profile, region, endpoint_url)
+        client = self._clients.get(key)
+        if client is None:
+            with self._clients_lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._session(profile).client(service, region_name=region, 
+                                            endpoint_url=endpoint_url, config=self._boto_cfg)
+                    self._clients[key] = client
+        return client
         
     def get_ec2_instance_families_from_cputype(self, cpu_type):
         return self.cpu_types.get(cpu_type,[])
@@ -1546,14 +1782,14 @@ class AWSBoto:
         return self.gpu_types.get(gpu_type,"")
     
     def get_ec2_cputype_from_instance_family(self, ifamily):
-        for cputype, families in self.cpu_types.items():
-            if ifamily in families:
-                return cputype
-        return ""
+        return self._family_to_cputype.get(ifamily, "")
 
     def get_ec2_instance_families(self, profile=None):        
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ec2 = session.client('ec2')
+        # the family list rarely changes, keep it on disk for a week 
+        families = self._ec2_family_cache(profile)
+        if families:
+            return families
+        ec2 = self._client('ec2', profile)
         families = set()
         try:
             paginator = ec2.get_paginator('describe_instance_types')
@@ -1568,34 +1804,79 @@ class AWSBoto:
             return
 
         # Convert the set to a list and sort it to list families in order
-        sorted_families = sorted(list(families))
+        sorted_families = sorted(families)
+        self._ec2_family_cache(profile, sorted_families)
         return sorted_families
-    
-    def get_ec2_smallest_instance_type(self, family, min_vcpu, min_memory, gpu_type=None, profile=None):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ec2 = session.client('ec2')
 
-        # Initialize variables
-        suitable_types = []
+    def _ec2_family_cache(self, profile=None, families=None, ttl=7*24*3600):
+        # read (families=None) or write the cached instance families of a profile
+        cache, mtime = self._disk_cache_load('ec2_families')
+        if time.time() - mtime > ttl:
+            cache = {}
+        if families is None:
+            return cache.get(profile or 'default', [])
+        cache[profile or 'default'] = families
+        self._disk_cache_save('ec2_families', cache)
+        return families
+
+    def _disk_cache_load(self, name):
+        # returns (dict, mtime) of ~/.config/aws-eb/cache/{name}.json, ({}, 0) if missing
+        cachefile = os.path.join(self.cfg.config_root_local, 'cache', f'{name}.json')
         try:
-            paginator = ec2.get_paginator('describe_instance_types')
-            for page in paginator.paginate():
-                for itype in page['InstanceTypes']:
-                    # Check if the instance type belongs to the specified family
-                    if itype['InstanceType'].startswith(family):
-                        vcpus = itype['VCpuInfo']['DefaultVCpus']
-                        memory = itype['MemoryInfo']['SizeInMiB']
+            with open(cachefile, 'r') as f:
+                return json.load(f), os.path.getmtime(cachefile)
+        except (OSError, ValueError):
+            return {}, 0
 
-                        # Check if the instance meets the minimum vCPU and memory requirements
-                        if vcpus >= min_vcpu and memory >= min_memory:
-                            suitable_types.append(itype)
+    def _disk_cache_save(self, name, cache):
+        cachefile = os.path.join(self.cfg.config_root_local, 'cache', f'{name}.json')
+        try:
+            os.makedirs(os.path.dirname(cachefile), exist_ok=True)
+            with open(cachefile, 'w') as f:
+                json.dump(cache, f)
+        except OSError as e:
+            self.cfg.printdbg(f'Could not write {cachefile}: {e}')
+
+    def _disk_cache_get(self, name, key, ttl):
+        # value of key in cache file name if it was stored less than ttl seconds ago
+        entry = self._disk_cache_load(name)[0].get(key)
+        if entry and time.time() - entry.get('time', 0) < ttl:
+            return entry['value']
+        return None
 
-            # Sort suitable types by vCPUs and memory to try to get the smallest (and possibly cheapest) type
-            suitable_types.sort(key=lambda x: (x['VCpuInfo']['DefaultVCpus'], x['MemoryInfo']['SizeInMiB']))
+    def _disk_cache_put(self, name, key, value):
+        cache, _ = self._disk_cache_load(name)
+        cache[key] = {'value': value, 'time': time.time()}
+        self._disk_cache_save(name, cache)
+        return value
+
+    def _bucket_acl_cache(self, bucket, profile=None, readwrite=False, ok=None, ttl=3600):
+        # read (ok=None) or write the result of a successful check_bucket_access,
+        # a read/write check also covers a read only check 
+        key = f'{profile or "default"}/{bucket}'
+        cache, _ = self._disk_cache_load('bucket_acl')
+        if ok is None:
+            entry = cache.get(key)
+            return bool(entry and time.time() - entry['time'] < ttl 
+                        and (entry['readwrite'] or not readwrite))
+        if ok:
+            cache[key] = {'readwrite': readwrite, 'time': time.time()}
+        elif key in cache:
+            del cache[key]
+        else:
+            return
+        self._disk_cache_save('bucket_acl', cache)
 
-            # Assuming the first instance type is the cheapest based on the sorting
+    def _invalidate_bucket_acl(self, bucket, profile=None):
+        self._bucket_acl_cache(bucket, profile, ok=False)
+    
+    def get_ec2_smallest_instance_type(self, family, min_vcpu, min_memory, gpu_type=None, profile=None):
+        try:
+            # (vcpus, memory, name) tuples sort by vCPUs and memory, the smallest is likely the cheapest
+            suitable_types = [t for t in self._ec2_family_instance_types(family, profile)
+                              if t[0] >= min_vcpu and t[1] >= min_memory]
             if suitable_types:
-                return suitable_types[0]['InstanceType']
+                return min(suitable_types)[2]
             else:
                 return "No suitable instance type found."
 
@@ -1603,11 +1884,24 @@ class AWSBoto:
             print(f"Error retrieving instance types: {e}")
             return None
 
+    @functools.lru_cache(maxsize=128)
+    def _ec2_family_instance_types(self, family, profile=None):
+        # (vcpus, memory MiB, instance type) of all types in a family, 
+        # let EC2 filter by family instead of paging through the whole catalog
+        ec2 = self._client('ec2', profile)
+        paginator = ec2.get_paginator('describe_instance_types')
+        types = []
+        for page in paginator.paginate(Filters=[{'Name': 'instance-type', 'Values': [f'{family}.*']}]):
+            for itype in page['InstanceTypes']:
+                types.append((itype['VCpuInfo']['DefaultVCpus'], itype['MemoryInfo']['SizeInMiB'], 
+                              itype['InstanceType']))
+        return tuple(types)
+
     def get_aws_regions(self, profile=None, provider='AWS'):
         # returns a list of AWS regions 
         if provider == 'AWS':
             try:
-                session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+                session = self._session(profile)
                 regions = session.get_available_regions('ec2')
                 # make the list a little shorter 
                 regions = [i for i in regions if not i.startswith('ap-')]
@@ -1617,9 +1911,12 @@ class AWSBoto:
             
     def get_aws_account_and_user_id(self):
         # returns aws account_id, user_id, user_name
+        # the caller identity does not change during a run
+        if self._identity:
+            return self._identity
         # Initialize the STS client
         try:
-            sts_client = self.awssession.client('sts')
+            sts_client = self._client('sts', self.awsprofile)
             # Get the caller identity
             response = sts_client.get_caller_identity()
             # Extract the account ID
@@ -1628,7 +1925,8 @@ class AWSBoto:
             # Extract the ARN and parse the user ID
             arn = response['Arn']
             user_name = arn.split(':')[-1].split('/')[-1]
-            return account_id, user_id, user_name
+            self._identity = (account_id, user_id, user_name)
+            return self._identity
         except Exception as e:
             print(f"Error retrieving AWS account ID: {e}")
             return None, None, None
@@ -1638,12 +1936,14 @@ class AWSBoto:
         if not bucket_name:
             print('check_bucket_access: bucket_name empty. You may have not yet configured a S3 bucket name. Please run "aws-eb config" first')
             sys.exit(1)    
+        # permissions rarely change, skip the HEAD and PUT/DELETE probes for an hour
+        if self._bucket_acl_cache(bucket_name, profile, readwrite):
+            return True
         if not self._check_s3_credentials(profile):
             print('_check_s3_credentials failed. Please edit file ~/.aws/credentials')
             return False
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
         ep_url = self.cfg._get_aws_s3_session_endpoint_url(profile)
-        s3 = session.client('s3', endpoint_url=ep_url)
+        s3 = self._client('s3', profile, endpoint_url=ep_url)
         
         try:
             # Check if bucket exists
@@ -1663,6 +1963,7 @@ class AWSBoto:
             return False
 
         if not readwrite:
+            self._bucket_acl_cache(bucket_name, profile, readwrite, ok=True)
             return True
         
         # Test write access by uploading a small test file
@@ -1674,6 +1975,7 @@ class AWSBoto:
             # Clean up by deleting the test object
             s3.delete_object(Bucket=bucket_name, Key=test_object_key)
             #print(f"Successfully deleted test object from {bucket_name}")
+            self._bucket_acl_cache(bucket_name, profile, readwrite, ok=True)
             return True
         except botocore.exceptions.ClientError as e:
             print(f"Error: cannot write to bucket {bucket_name} in profile {self.awsprofile}: {e}")
@@ -1686,9 +1988,8 @@ class AWSBoto:
             print('check_s3_credentials failed. Please edit file ~/.aws/credentials')
             return False 
         region = self.cfg.get_aws_region(profile)
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
         ep_url = self.cfg._get_aws_s3_session_endpoint_url(profile)
-        s3_client = session.client('s3', endpoint_url=ep_url)        
+        s3_client = self._client('s3', profile, endpoint_url=ep_url)        
         existing_buckets = s3_client.list_buckets()
         for bucket in existing_buckets['Buckets']:
             if bucket['Name'] == bucket_name:
@@ -1768,7 +2069,7 @@ class AWSBoto:
         return True
     
     def _check_s3_credentials(self, profile=None, verbose=False):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        session = self._session(profile, fresh=True)
         try:
             if verbose or self.args.debug:
                 self.cfg.printdbg(f'  Checking credentials for profile "{profile}" ... ', end='')            
@@ -1809,71 +2110,112 @@ class AWSBoto:
         return True
     
     def s3_get_json(self, o_name):
+        # {} if the object does not exist yet, None if it could not be read
         try:
-            s3 = self.awssession.client('s3')        
+            s3 = self._client('s3', self.awsprofile)        
             obj = s3.get_object(Bucket=self.cfg.bucket, Key=o_name, RequestPayer='requester')
             return json.loads(obj['Body'].read())
+        except botocore.exceptions.ClientError as e:
+            # a missing status file is normal on the first run of a prefix
+            if e.response['Error']['Code'] in ('NoSuchKey', '404'):
+                return {}
+            self._invalidate_bucket_acl(self.cfg.bucket, self.awsprofile)
+            print(f"Error in s3_get_json accessing bucket '{self.cfg.bucket}': {e}")
+            return None
         except Exception as e:
             print(f"Error in s3_get_json accessing bucket '{self.cfg.bucket}': {e}")
-            return {}
+            return None
         
     def s3_put_json(self, o_name, json_data):
         try:
-            s3 = self.awssession.client('s3')
-            return s3.put_object(Bucket=self.cfg.bucket, Key=o_name, Body=json.dumps(json_data, indent=4), RequestPayer='requester')
+            s3 = self._client('s3', self.awsprofile)
+            # compact json, indenting makes the status objects much larger
+            body = json.dumps(json_data, separators=(',', ':')).encode()
+            return s3.put_object(Bucket=self.cfg.bucket, Key=o_name, 
+                                 Body=body, ContentType='application/json', RequestPayer='requester')
+        except botocore.exceptions.ClientError as e:
+            self._invalidate_bucket_acl(self.cfg.bucket, self.awsprofile)
+            print(f"Error in s3_put_json accessing bucket '{self.cfg.bucket}': {e}")
+            return False
         except Exception as e:
             print(f"Error in s3_put_json accessing bucket '{self.cfg.bucket}': {e}")
             return False
 
-    def s3_duplicate_bucket(self, src_bucket, dst_bucket, max_workers=100, tier='INTELLIGENT_TIERING'):
+    def _norm_prefix(self, prefix):
+        # a prefix ending in '/' does not match sibling keys like 'pfx-a' or 'pfx.b'
+        return prefix if not prefix or prefix.endswith('/') else prefix + '/'
 
-        s3 = self.awssession.client('s3')
+    def _s3_iter_objects(self, s3, bucket, prefix='', **kwargs):
+        # yield objects page by page instead of materializing the whole listing
+        paginator = s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix,
+                                       PaginationConfig={'PageSize': 1000}, **kwargs):
+            yield from page.get('Contents', [])
 
-        def s3_copy_object(s3, src_bucket, dst_bucket, obj, tier):
-            try:
-                # Check if the object exists in the destination bucket
-                dest_obj = s3.head_object(Bucket=dst_bucket, Key=obj['Key'], RequestPayer='requester')
-                # Compare ETags (remove quotation marks from ETags if necessary)
-                if dest_obj['ETag'] == obj['ETag']:
-                    print(f"  Skipping {obj['Key']}, target exists.")
-                    return
-            except botocore.exceptions.ClientError:
-                # Object does not exist in the destination bucket
-                pass
-            except Exception as e:
-                print(f"Error 1 in s3_copy_object: {e}")
-                pass
+    def s3_duplicate_bucket(self, src_bucket, dst_bucket, max_workers=64, tier='INTELLIGENT_TIERING'):
+
+        s3 = self._client('s3', self.awsprofile)
+        # one listing of the target bucket replaces a HEAD request per object
+        try:
+            dst_index = {o['Key']: o['ETag'] for o in self._s3_iter_objects(s3, dst_bucket, RequestPayer='requester')}
+        except Exception as e:
+            print(f"Error listing {dst_bucket} in s3_duplicate_bucket: {e}")
+            dst_index = {}
+
+        def s3_copy_object(obj):
+            if dst_index.get(obj['Key']) == obj['ETag']:
+                print(f"  Skipping {obj['Key']}, target exists.")
+                return
 
-            # Copy object with Requester Pays option
+            # Copy object with Requester Pays option, the client retries with adaptive backoff
+            copy_source = {'Bucket': src_bucket, 'Key': obj['Key']}
             try:
-                copy_source = {'Bucket': src_bucket, 'Key': obj['Key']}
-                s3.copy(copy_source, dst_bucket, obj['Key'],
-                    ExtraArgs={'RequestPayer': 'requester', 'StorageClass': tier})
+                if obj.get('Size', 0) < 5*1024**3:
+                    # a single CopyObject request, no multipart overhead
+                    s3.copy_object(CopySource=copy_source, Bucket=dst_bucket, Key=obj['Key'],
+                        RequestPayer='requester', StorageClass=tier)
+                else:
+                    s3.copy(copy_source, dst_bucket, obj['Key'],
+                        ExtraArgs={'RequestPayer': 'requester', 'StorageClass': tier},
+                        Config=self._copy_cfg, SourceClient=s3)
                 print(f"Copied {obj['Key']} from {src_bucket} to {dst_bucket}")
-            except Exception as e:               
-                print(f"Error 2 in s3_copy_object: {e}")
-                pass
+            except Exception as e:
+                print(f"Error in s3_copy_object copying {obj['Key']}: {e}")
 
         try:
-            paginator = s3.get_paginator('list_objects_v2')
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-                # Iterate over each page in the paginator
-                for page in paginator.paginate(Bucket=src_bucket, RequestPayer='requester'):
-                    if 'Contents' in page:
-                        # Submit each object copy to the thread pool
-                        futures = [executor.submit(s3_copy_object, s3, src_bucket, dst_bucket, obj, tier)
-                                for obj in page['Contents']] # if obj['Size'] <= 5 * 1024 * 1024 * 1024
-                        # Wait for all submitted futures to complete
-                        concurrent.futures.wait(futures)
+                # the workers run across page boundaries of the source listing, at most 
+                # max_workers*4 copies are queued so a large bucket is never held in memory
+                pending = set()
+                for obj in self._s3_iter_objects(s3, src_bucket, RequestPayer='requester'):
+                    if len(pending) >= max_workers*4:
+                        done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        for future in done:
+                            future.result()
+                    pending.add(executor.submit(s3_copy_object, obj))
+                for future in concurrent.futures.as_completed(pending):
+                    future.result()
         except Exception as e:
             print(f"Error in s3_duplicate_bucket(): {e}")
             return False
 
-    def s3_download_untar(self, src_bucket, prefix, dst_root, max_workers=100):
-
-        s3 = self.awssession.client('s3')
-        if not prefix.endswith('/'):
-            prefix += '/'
+    def s3_download_untar(self, src_bucket, prefix, dst_root, max_workers=32):
+
+        s3 = self._client('s3', self.awsprofile)
+        prefix = self._norm_prefix(prefix)
+        # stream download -> pigz -> tar without temp files, gzip if there is no
+        # pigz and only fall back to tarfile if there is no tar either
+        unzip = None
+        if shutil.which('tar'):
+            if shutil.which('pigz'):
+                unzip = ['pigz', '-dc']
+            elif shutil.which('gzip'):
+                unzip = ['gzip', '-dc']
+        # python-isal inflates ~3x faster than zlib, use it for the tarfile fallback if installed
+        try:
+            from isal.igzip import IGzipFile as gzopen
+        except ImportError:
+            gzopen = gzip.GzipFile
 
         def s3_untar_object(s3, src_bucket, prefix, obj, dst_root):
             try:
@@ -1888,25 +2230,20 @@ class AWSBoto:
                         print(f"   Extr. {obj['Key']} ...")
                     if not os.path.exists(dst_fld):
                         os.makedirs(dst_fld, exist_ok=True)              
-                    fobj = s3.get_object(Bucket=src_bucket, Key=obj['Key'], RequestPayer='requester')
-                    stream = fobj['Body']
-                    with tarfile.open(mode="r|gz", fileobj=stream._raw_stream) as tar:
-                        for member in tar:
-                            # Extract each member while preserving attributes
-                            tar.extract(member, path=dst_fld)                
+                    if unzip:
+                        self._s3_untar_pigz(s3, src_bucket, obj['Key'], obj['Size'], dst_fld, unzip)
+                        # Some extracted files may have wrong permissions, fix them, add rw to owner,
+                        # the tarfile paths below set these bits while extracting
+                        self._add_owner_rw(dst_fld)
+                    elif shutil.which('pigz'):
+                        # no tar binary, but pigz can still do the inflating for tarfile
+                        self._s3_untar_pigz_tarfile(s3, src_bucket, obj['Key'], obj['Size'], dst_fld)
+                    else:
+                        self._s3_untar_gzip_tarfile(s3, src_bucket, obj['Key'], obj['Size'], dst_fld, gzopen)
                     # Alternative method using BytesIO but consumes much more memory
                     # tar_obj = tarfile.open(fileobj=io.BytesIO(stream.read()), mode="r:gz")
                     # tar_obj.extractall(path=dst_fld)
                     #
-                    # Some extracted files may have wrong permissions, fix them, add rw to owner
-                    for root, dirs, files in self.cfg._walker(dst_fld):
-                        for name in dirs + files:
-                            full_path = os.path.join(root, name)
-                            current_permissions = os.stat(full_path).st_mode
-                            # Preserve the owner's execute bit if it's set, only modify read and write bits
-                            owner_execute = current_permissions & 0o100  # Owner execute bit
-                            new_permissions = (current_permissions & 0o7077) | 0o600 | owner_execute
-                            os.chmod(full_path, new_permissions)
                     with open(stub_file, 'w') as fil:
                         pass 
                 else:
@@ -1919,57 +2256,185 @@ class AWSBoto:
                 return False
 
         try:
-            paginator = s3.get_paginator('list_objects_v2')
             with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:            
-                # Iterate over each page in the paginator
-                for page in paginator.paginate(Bucket=src_bucket, Prefix=prefix, RequestPayer='requester'):
-                    if 'Contents' in page:
-                        # Submit each object copy to the thread pool
-                        futures = [executor.submit(s3_untar_object, s3, src_bucket, prefix, obj, dst_root)
-                                for obj in page['Contents']] # if obj['Size'] <= 5 * 1024 * 1024 * 1024
-                        # Wait for all submitted futures to complete
-                        concurrent.futures.wait(futures)
+                futures = [executor.submit(s3_untar_object, s3, src_bucket, prefix, obj, dst_root)
+                        for obj in self._s3_iter_objects(s3, src_bucket, prefix, RequestPayer='requester')]
+                # Wait for all submitted futures to complete
+                concurrent.futures.wait(futures)
         except Exception as e:
             print(f"Error in s3_download_untar: {e}")
             return False
 
+    def _s3_untar_gzip_tarfile(self, s3, bucket, key, size, dst_fld, gzopen=gzip.GzipFile):
+        # S3 -> os.pipe -> gzip -> tarfile, a thread fetches range GETs into the pipe 
+        # while this thread inflates and extracts, zlib and socket reads release the GIL
+        rfd, wfd = os.pipe()
+        reader = os.fdopen(rfd, 'rb', buffering=4*1024*1024)
+        writer = os.fdopen(wfd, 'wb', buffering=0)
+        def feed():
+            try:
+                self._s3_get_ranges(s3, bucket, key, size, writer, max_workers=8)
+            except BrokenPipeError:
+                pass
+            finally:
+                writer.close()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            feeder = executor.submit(feed)
+            try:
+                self._untar_gz_stream(gzopen(fileobj=reader), dst_fld)
+            finally:
+                # drain so the feeder can never block on a full pipe
+                with open(os.devnull, 'wb') as devnull:
+                    shutil.copyfileobj(reader, devnull)
+                reader.close()
+                feeder.result()
+
+    def _untar_gz_stream(self, gz, dst_fld):
+        # large buffers on both sides of the gzip decoder, tarfile
+        # defaults to 10 KiB blocks and 16 KiB copy buffers
+        buf = io.BufferedReader(gz, 1024*1024)
+        with tarfile.open(mode="r|", fileobj=buf, bufsize=1024*1024, 
+                          copybufsize=2*1024*1024) as tar:
+            for member in tar:
+                # Extract each member while preserving attributes, add rw to owner
+                member.mode |= 0o600
+                tar.extract(member, path=dst_fld)
+
+    def _add_owner_rw(self, top):
+        # add rw for the owner below top and keep all other bits, one 'chmod -R' 
+        # instead of a stat and chmod per file from Python, chmod -R does not 
+        # follow symlinks, the Python fallback does not either
+        try:
+            subprocess.run(['chmod', '-R', 'u+rw', top], check=True)
+            return
+        except (OSError, subprocess.CalledProcessError) as e:
+            self.cfg.printdbg(f'chmod -R u+rw {top} failed: {e}')
+        # scandir on directory fds: lstat and chmod relative to the open directory 
+        # skip the path lookup from the root, entries that are already rw are skipped
+        stack = [top]
+        while stack:
+            dirpath = stack.pop()
+            try:
+                dfd = os.open(dirpath, os.O_RDONLY | os.O_DIRECTORY)
+            except OSError as e:
+                self.cfg._walkerr(e)
+                continue
+            try:
+                with os.scandir(dfd) as it:
+                    for entry in it:
+                        if entry.is_symlink():
+                            continue
+                        mode = entry.stat(follow_symlinks=False).st_mode
+                        if mode & 0o600 != 0o600:
+                            os.chmod(entry.name, mode | 0o600, dir_fd=dfd)
+                        if entry.is_dir(follow_symlinks=False) and entry.name not in ('.snapshot', '__archive__'):
+                            stack.append(os.path.join(dirpath, entry.name))
+            finally:
+                os.close(dfd)
+
+    def _s3_untar_pigz(self, s3, bucket, key, size, dst_fld, unzip=['pigz', '-dc']):
+        # stream an S3 object through 'pigz -dc | tar -xf -' connected via os.pipe
+        rfd, wfd = os.pipe()
+        try:
+            tar = subprocess.Popen(['tar', '--no-same-owner', '-xf', '-', '-C', dst_fld], stdin=rfd)
+            pigz = subprocess.Popen(unzip, stdin=subprocess.PIPE, stdout=wfd)
+        finally:
+            # the children hold their own copies of the pipe ends
+            os.close(rfd)
+            os.close(wfd)
+        try:
+            self._s3_get_ranges(s3, bucket, key, size, pigz.stdin)
+        finally:
+            try:
+                pigz.stdin.close()
+            except BrokenPipeError:
+                pass
+            pigz.wait()
+            tar.wait()
+        if pigz.returncode != 0 or tar.returncode != 0:
+            raise RuntimeError(f'{unzip[0]}/tar returned {pigz.returncode}/{tar.returncode} for {key}')
+
+    def _s3_untar_pigz_tarfile(self, s3, bucket, key, size, dst_fld):
+        # S3 -> 'pigz -dc' -> tarfile, a thread feeds pigz while tarfile reads its output
+        pigz = subprocess.Popen(['pigz', '-dc'], stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=1024*1024)
+        def feed():
+            try:
+                self._s3_get_ranges(s3, bucket, key, size, pigz.stdin)
+            except BrokenPipeError:
+                pass
+            finally:
+                try:
+                    pigz.stdin.close()
+                except BrokenPipeError:
+                    pass
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            feeder = executor.submit(feed)
+            try:
+                with tarfile.open(mode="r|", fileobj=pigz.stdout, bufsize=1024*1024, 
+                                  copybufsize=2*1024*1024) as tar:
+                    for member in tar:
+                        member.mode |= 0o600
+                        tar.extract(member, path=dst_fld)
+            finally:
+                # drain so the feeder can never block on a full pipe
+                with open(os.devnull, 'wb') as devnull:
+                    shutil.copyfileobj(pigz.stdout, devnull)
+                pigz.stdout.close()
+                feeder.result()
+                pigz.wait()
+        if pigz.returncode != 0:
+            raise RuntimeError(f'pigz returned {pigz.returncode} for {key}')
+
+    def _s3_get_ranges(self, s3, bucket, key, size, fileobj, chunksize=16*1024*1024, max_workers=4):
+        # download an object with parallel range GETs and write the chunks
+        # in order to fileobj, at most max_workers chunks are kept in memory
+        def get_range(start, end):
+            resp = s3.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-{end}', RequestPayer='requester')
+            return resp['Body'].read()
+
+        if size <= chunksize:
+            fobj = s3.get_object(Bucket=bucket, Key=key, RequestPayer='requester')
+            shutil.copyfileobj(fobj['Body'], fileobj, chunksize)
+            return
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = collections.deque()
+            for start in range(0, size, chunksize):
+                pending.append(executor.submit(get_range, start, min(start+chunksize, size)-1))
+                if len(pending) >= max_workers:
+                    fileobj.write(pending.popleft().result())
+            while pending:
+                fileobj.write(pending.popleft().result())
+
     def s3_get_size_gb(self, bucket, prefix):
+        # listing a large prefix takes many requests, remember the sum for this run
+        prefix = self._norm_prefix(prefix)
+        if (bucket, prefix) in self._s3_sizes:
+            return self._s3_sizes[(bucket, prefix)]
         try:
-            s3 = self.awssession.client('s3')
-            if not prefix.endswith('/'):
-                prefix += '/'
-            total_size_bytes = 0
-            paginator = s3.get_paginator('list_objects_v2')
-            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
-                if 'Contents' in page:
-                    for obj in page['Contents']:
-                        total_size_bytes += obj['Size']
+            s3 = self._client('s3', self.awsprofile)
+            total_size_bytes = sum(obj['Size'] for obj in self._s3_iter_objects(s3, bucket, prefix))
             total_size_gib = total_size_bytes / (2**30)
+            self._s3_sizes[(bucket, prefix)] = total_size_gib
             return total_size_gib
         except Exception as e:
             print(f"Error in s3_get_size_gb: {e}")
             return 0
 
     def _extract_last_float(self, input_string):
-        # Finding all occurrences of a floating-point number pattern
-        matches = re.findall(r'\d+\.\d+', input_string)
-        if matches:
-            # Return the last match
-            return float(matches[-1])
-        else:
-            return None
+        # the last floating-point number in the string, no list of all matches
+        last = None
+        for last in _FLOAT_RE.finditer(input_string):
+            pass
+        return float(last.group()) if last else None
 
     def ec2_deploy(self, disk_gib, instance_type, awsprofile=None):
 
-        try:
-            import boto3
-        except:
-            print('Error: boto3 package not found. Install it first, please run:')
-            print('python3 -m pip install --user --upgrade boto3')
-            sys.exit(1)        
-
         if not awsprofile: 
             awsprofile = self.cfg.awsprofile
+        # check the credentials for the instance before launching it
+        creds = self._env_credentials()
+        if not creds:
+            return False
         prof = self._ec2_create_iam_policy_roles_ec2profile()            
         iid, ip = self._ec2_launch_instance(disk_gib, instance_type, prof, awsprofile)
         if not iid:
@@ -1977,13 +2442,27 @@ class AWSBoto:
         print(' Waiting for ssh host to become ready ...')
         if not self.cfg.wait_for_ssh_ready(ip):
             return False
-        bootstrap_build = self._ec2_user_space_script(iid)        
+        bootstrap_build = self._ec2_user_space_script(creds, iid)        
 
         ### this block may need to be moved to a function
-        cmdlist = [item for item in sys.argv]
-        awsargs = ['--instance-type', '-t', '--az', '-z', '--on-demand', '-d'] # if found remove option and next arg        
-        cmdlist = [x for i, x in enumerate(cmdlist) if x \
-                   not in awsargs and (i == 0 or cmdlist[i-1] not in awsargs)]  
+        # drop the launch options that only matter on this machine, valued options with 
+        # their value. Only look after the subcommand, -d before it is the global --debug
+        awsargs = {'--instance-type', '-t', '--az', '-z', '--disk', '-d'}
+        awsflags = {'--on-demand', '-w'}
+        sub = next((i for i, arg in enumerate(sys.argv[1:], 1) if arg in ('launch', 'lau')), len(sys.argv))
+        cmdlist = sys.argv[:sub+1]
+        skip = False
+        for arg in sys.argv[sub+1:]:
+            if skip:
+                skip = False
+            elif arg in awsargs:
+                skip = True
+            elif arg.startswith('--') and arg.split('=', 1)[0] in awsargs:
+                pass # --disk=500 form
+            elif not arg.startswith('--') and arg[:2] in awsargs:
+                pass # -d500 form
+            elif arg not in awsflags:
+                cmdlist.append(arg)
         if not '--profile' in cmdlist and self.args.awsprofile:
             cmdlist.insert(1,'--profile')
             cmdlist.insert(2, self.args.awsprofile)
@@ -1998,18 +2477,16 @@ class AWSBoto:
         if not self.args.keeprunning:
             bootstrap_build += f'\n[ ! -f ~/no-terminate ] && $PYBIN ~/.local/bin/{self.scriptname} ssh --terminate {iid}'
         sshuser = self.ec2_get_default_user(ip)
+        # the uploads and commands below share one ssh connection
+        self.ssh_master(sshuser, ip)
         ret = self.ssh_upload(sshuser, ip,
             self._ec2_easybuildrc(), "easybuildrc", is_string=True)
         ret = self.ssh_upload(sshuser, ip,
             bootstrap_build, "bootstrap.sh", is_string=True)        
         #if ret.stdout or ret.stderr:
             #print(ret.stdout, ret.stderr)
-        ret = self.ssh_execute(sshuser, ip, 
-            'mkdir -p ~/.config/aws-eb/general')
-        if ret.stdout or ret.stderr:
-            print(ret.stdout, ret.stderr)        
-        ret = self.ssh_upload(sshuser, ip,
-            "~/.config/aws-eb/general/*", ".config/aws-eb/general/")
+        ret = self.ssh_upload_dir(sshuser, ip,
+            "~/.config/aws-eb/general", ".config/aws-eb")
         #if ret.stdout or ret.stderr:
             #print(ret.stdout, ret.stderr)        
         ret = self.ssh_execute(sshuser, ip, 
@@ -2019,18 +2496,18 @@ class AWSBoto:
         print(' Executed bootstrap and build script ... you may have to wait a while ...')
         print(' but you can already login using "aws-eb ssh"')
 
-        if os.path.exists(os.path.expanduser('~/.bash_history.tmp')):
-            os.remove(os.path.expanduser('~/.bash_history.tmp'))
-        qt = "'"
-        os.system(f'echo "touch ~/no-terminate && pkill -f aws-eb" >> ~/.bash_history.tmp')
-        os.system(f'echo "pkill -f easybuild.main # skip the currently building easyconfig" >> ~/.bash_history.tmp')        
-        os.system(f'echo "grep -B1 -A1 {qt}chars): Couldn.t find file{qt} ~/out.easybuild.{ip}.txt | grep FAILED:" >> ~/.bash_history.tmp')        
-        os.system(f'echo "grep -A1 {qt}^== FAILED:{qt} ~/out.easybuild.{ip}.txt" >> ~/.bash_history.tmp')
-        os.system(f'echo "grep -A1 {qt}^== COMPLETED:{qt} ~/out.easybuild.{ip}.txt" >> ~/.bash_history.tmp')
-        os.system(f'echo "tail -n 100 -f ~/out.easybuild.{ip}.txt" >> ~/.bash_history.tmp')
-        os.system(f'echo "tail -n 30 -f ~/out.bootstrap.{ip}.txt" >> ~/.bash_history.tmp')
+        # handy commands in the shell history of the new instance
+        bash_history = '\n'.join([
+            "touch ~/no-terminate && pkill -f aws-eb",
+            "pkill -f easybuild.main # skip the currently building easyconfig",
+            f"grep -B1 -A1 'chars): Couldn.t find file' ~/out.easybuild.{ip}.txt | grep FAILED:",
+            f"grep -A1 '^== FAILED:' ~/out.easybuild.{ip}.txt",
+            f"grep -A1 '^== COMPLETED:' ~/out.easybuild.{ip}.txt",
+            f"tail -n 100 -f ~/out.easybuild.{ip}.txt",
+            f"tail -n 30 -f ~/out.bootstrap.{ip}.txt",
+        ]) + '\n'
         ret = self.ssh_upload(sshuser, ip,
-            "~/.bash_history.tmp", ".bash_history")
+            bash_history, ".bash_history", is_string=True)
         if ret.stdout or ret.stderr:
             #print(ret.stdout, ret.stderr)
             pass
@@ -2040,34 +2517,26 @@ class AWSBoto:
 
     def _ec2_describe_instance_families(self, cpu_type, vcpus=1, memory_gb=1, region=None):
         # use a filter on ec2.describe_instance_types() to get a list of instance types
-        ec2 = boto3.client('ec2', region_name=region) if region else self.awssession.client('ec2')
-
-        instance_families = self.cpu_types[cpu_type]
-        filtered_instance_families = []
-
         try:
-            # Retrieve all instance types
-            paginator = ec2.get_paginator('describe_instance_types')
-            page_iterator = paginator.paginate()
-
-            for page in page_iterator:
-                for instance_type in page['InstanceTypes']:
-                    if instance_type['InstanceType'].startswith(instance_families) and \
-                    instance_type['VCpuInfo']['DefaultVCpus'] >= vcpus and \
-                    instance_type['MemoryInfo']['SizeInMiB'] >= memory_gb * 1024:
-                        filtered_instance_families.append(instance_type)
-
-            #instance_ids = [i['InstanceType'] for i in filtered_instance_families]
-            #print('\nfiltered_instance_families:', instance_ids)
+            instance_types = self._ec2_instance_types_of_families(self.cpu_types[cpu_type], region)
         except Exception as e:
             print(f"Error retrieving instance types: {e}")
             return []
-        
-        return filtered_instance_families
+        return [i for i in instance_types if i['VCpuInfo']['DefaultVCpus'] >= vcpus 
+                and i['MemoryInfo']['SizeInMiB'] >= memory_gb * 1024]
+
+    @functools.lru_cache(maxsize=32)
+    def _ec2_instance_types_of_families(self, instance_families, region=None):
+        # all instance types of a tuple of families, EC2 filters them server side, 
+        # the returned dicts are shared between calls, do not modify them 
+        ec2 = self._client('ec2', region=region) if region else self._client('ec2', self.awsprofile)
+        paginator = ec2.get_paginator('describe_instance_types')
+        filters = [{'Name': 'instance-type', 'Values': [f'{f}.*' for f in instance_families]}]
+        return tuple(itype for page in paginator.paginate(Filters=filters)
+                     for itype in page['InstanceTypes'])
     
     def _ec2_create_or_get_iam_policy(self, pol_name, pol_doc, profile=None):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        iam = session.client('iam')
+        iam = self._client('iam', profile)
 
         policy_arn = None
         try:
@@ -2098,10 +2567,9 @@ class AWSBoto:
 
     def _ec2_create_aws_eb_iam_policy(self, profile=None):
         # Initialize session with specified profile or default
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
 
         # Create IAM client
-        iam = session.client('iam')
+        iam = self._client('iam', profile)
 
         # Define policy name and policy document
         policy_name = 'AWS-EBEC2DescribePolicy'
@@ -2139,8 +2607,7 @@ class AWSBoto:
     def _ec2_create_iam_policy_roles_ec2profile(self, profile=None):
         # create all the IAM requirement to allow an ec2 instance to
         # 1. self destruct, 2. monitor cost with CE and 3. send emails via SES
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        iam = session.client('iam')
+        iam = self._client('iam', profile)
 
       # Step 0: Create IAM self destruct and EC2 read policy 
         policy_document = {
@@ -2270,9 +2737,8 @@ class AWSBoto:
         return instance_profile_name
     
     def _ec2_create_and_attach_security_group(self, instance_id, profile=None):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ec2 = session.resource('ec2')
-        client = session.client('ec2')
+        ec2 = self._resource('ec2', profile)
+        client = self._client('ec2', profile)
 
         group_name = 'SSH-HTTP-ICMP'
         
@@ -2335,9 +2801,28 @@ class AWSBoto:
 
         return security_group_id
 
+    def _ec2_get_latest_ami(self, profile=None, ttl=24*3600):
+        # latest image of args.os, describe_images takes seconds, 
+        # so the image id is cached on disk for a day
+        arch = 'arm64' if self.args.cputype.startswith('graviton') else 'x86_64'
+        key = f'{profile or "default"}/{self.cfg.get_aws_region(profile)}/{self.args.os}/{arch}'
+        imageid = self._disk_cache_get('ami', key, ttl)
+        if imageid:
+            return imageid
+        if self.args.os.lower() == 'amazon':
+            imageid = self._ec2_get_latest_amazon_linux_ami(profile)
+        elif self.args.os.lower() == 'ubuntu':
+            imageid = self._ec2_get_latest_ubuntu_lts_ami(profile)
+        elif self.args.os.lower() == 'rhel':
+            imageid = self._ec2_get_latest_rocky_linux_ami(profile)
+        else:
+            imageid = self._ec2_get_latest_other_linux_ami(self.args.os, profile)
+        if imageid:
+            self._disk_cache_put('ami', key, imageid)
+        return imageid
+
     def _ec2_get_latest_amazon_linux_ami(self, profile=None):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ec2_client = session.client('ec2')
+        ec2_client = self._client('ec2', profile)
 
         myarch = 'x86_64'
         if self.args.cputype.startswith('graviton'):
@@ -2363,8 +2848,7 @@ class AWSBoto:
             return None       
 
     def _ec2_get_latest_ubuntu_lts_ami(self, profile=None):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ec2_client = session.client('ec2')
+        ec2_client = self._client('ec2', profile)
 
         myarch = 'x86_64'
         if self.args.cputype.startswith('graviton'):
@@ -2391,8 +2875,7 @@ class AWSBoto:
             return None        
 
     def _ec2_get_latest_rocky_linux_ami(self, profile=None):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ec2_client = session.client('ec2')
+        ec2_client = self._client('ec2', profile)
 
         myarch = 'x86_64'
         if self.args.cputype.startswith('graviton'):
@@ -2423,8 +2906,7 @@ class AWSBoto:
             return None 
 
     def _ec2_get_latest_other_linux_ami(self, osname, profile=None):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ec2_client = session.client('ec2')
+        ec2_client = self._client('ec2', profile)
 
         myarch = 'x86_64'
         if self.args.cputype.startswith('graviton'):
@@ -2445,8 +2927,13 @@ class AWSBoto:
         else:
             return None 
 
-    def _ec2_ondemand_price(self, instance_type, region='us-west-2'):
-        pricing_client = boto3.client('pricing', region_name='us-east-1')
+    def _ec2_ondemand_price(self, instance_type, region='us-west-2', ttl=7*24*3600):
+        # on-demand prices rarely change, keep them on disk for a week
+        key = f'{region}/{instance_type}'
+        price = self._disk_cache_get('ondemand_price', key, ttl)
+        if price is not None:
+            return price
+        pricing_client = self._client('pricing', region='us-east-1')
         try:
             region_map = {
                 'af-south-1': 'Africa (Cape Town)',
@@ -2488,42 +2975,55 @@ class AWSBoto:
             )
             price_list = [json.loads(price_str) for price_str in response['PriceList']]
             on_demand_price = float(price_list[0]['terms']['OnDemand'][list(price_list[0]['terms']['OnDemand'])[0]]['priceDimensions'][list(price_list[0]['terms']['OnDemand'][list(price_list[0]['terms']['OnDemand'])[0]]['priceDimensions'])[0]]['pricePerUnit']['USD'])
-            return on_demand_price
+            return self._disk_cache_put('ondemand_price', key, on_demand_price)
         except Exception as e:
             print(f"Error getting on-demand price: {e}")
             return 100 # return a high price to make sure it is not used
         
-    def _ec2_current_spot_price(self, instance_type, regions=['us-west-2', 'us-west-1', 'us-east-2', 'us-east-1', 'ca-central-1']):
+    def _ec2_current_spot_price(self, instance_type, regions=['us-west-2', 'us-west-1', 'us-east-2', 'us-east-1', 'ca-central-1'], ttl=4*3600):
         PRODUCT = ['Linux/UNIX']
         lowest_price = float('inf')
         lowest_az = None
 
+        # spot prices move slowly, reuse a lookup for a few hours
+        key = f'current/{instance_type}/{",".join(regions)}'
+        cached = self._disk_cache_get('spot_price', key, ttl)
+        if cached:
+            return tuple(cached)
+
+        def region_prices(region):
+            # one request per region instead of one per AZ, StartTime=now 
+            # returns the current price of every AZ, newest records first
+            ec2_client = self._client('ec2', region=region)
+            paginator = ec2_client.get_paginator('describe_spot_price_history')
+            prices = {}
+            for page in paginator.paginate(InstanceTypes=[instance_type], ProductDescriptions=PRODUCT,
+                                           StartTime=datetime.datetime.now(datetime.timezone.utc)):
+                for rec in page['SpotPriceHistory']:
+                    prices.setdefault(rec['AvailabilityZone'], float(rec['SpotPrice']))
+            return prices
+
         print(f'Gathering spot prices from {", ".join(regions)} ... ')
-        for region in regions:
-            ec2_client = boto3.client(service_name='ec2', region_name=region)           
-            response = ec2_client.describe_availability_zones()
-
-            for az in response['AvailabilityZones']:
-                spot_response = ec2_client.describe_spot_price_history(
-                    InstanceTypes=[instance_type],
-                    ProductDescriptions=PRODUCT,
-                    MaxResults=1,
-                    AvailabilityZone=az['ZoneName']
-                )
-
-                if spot_response['SpotPriceHistory']:
-                    price = float(spot_response['SpotPriceHistory'][0]['SpotPrice'])
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(regions) or 1) as executor:
+            for prices in executor.map(region_prices, regions):
+                for az, price in prices.items():
                     if price < lowest_price:
                         lowest_price = price
-                        lowest_az = f"{az['ZoneName']}"
+                        lowest_az = az
 
+        if lowest_az:
+            self._disk_cache_put('spot_price', key, [lowest_price, lowest_az])
         return lowest_price, lowest_az
 
-    def _ec2_get_cheapest_spot_instance(self, cpu_type, vcpus=1, memory_gb=1, region=None):        
-        ec2 = boto3.client('ec2', region_name=region) if region else self.awssession.client('ec2')
+    def _ec2_get_cheapest_spot_instance(self, cpu_type, vcpus=1, memory_gb=1, region=None, ttl=4*3600):        
+        ec2 = self._client('ec2', region=region) if region else self._client('ec2', self.awsprofile)
         # Validate CPU type
         if cpu_type not in self.cpu_types:
             return "Invalid CPU type.", None, None    
+        key = f'cheapest/{region or self.cfg.aws_region}/{cpu_type}/{vcpus}/{memory_gb}'
+        cached = self._disk_cache_get('spot_price', key, ttl)
+        if cached:
+            return tuple(cached)
       
         try:
             # Filter instances by vCPUs, memory, and CPU type
@@ -2541,23 +3041,25 @@ class AWSBoto:
                 ProductDescriptions=['Linux/UNIX'],
                 MaxResults=len(instance_ids)
             )
-            # Find the cheapest instance
-            cheapest_instance = min(spot_prices['SpotPriceHistory'], key=operator.itemgetter('SpotPrice'))
-            return cheapest_instance['InstanceType'], cheapest_instance['AvailabilityZone'], float(cheapest_instance['SpotPrice'])
+            # Find the cheapest instance, SpotPrice is a string, compare it as a number
+            cheapest_instance = min(spot_prices['SpotPriceHistory'], key=lambda p: float(p['SpotPrice']))
+            return tuple(self._disk_cache_put('spot_price', key, [cheapest_instance['InstanceType'], 
+                            cheapest_instance['AvailabilityZone'], float(cheapest_instance['SpotPrice'])]))
     
         except Exception as e:
             print(f"Error in _ec2_get_cheapest_spot_instance: {e}")
             return None, None, None
 
-    def _create_progress_bar(self, max_value):
+    def _create_progress_bar(self, max_value, length=50):
+        # build the bar from two fixed strings, slicing instead of new strings per tick
+        full, empty = "█" * length, '-' * length
         def show_progress_bar(iteration):
-            percent = ("{0:.1f}").format(100 * (iteration / float(max_value)))
-            length = 50  # adjust as needed for the bar length
-            filled_length = int(length * iteration // max_value)
-            bar = "█" * filled_length + '-' * (length - filled_length)
-            print(f'\r|{bar}| {percent}%', end='\r')
+            filled_length = length * iteration // max_value
+            sys.stdout.write(f'\r|{full[:filled_length]}{empty[filled_length:]}| '
+                             f'{100 * iteration / max_value:.1f}%\r')
             if iteration == max_value: 
-                print()
+                sys.stdout.write('\n')
+            sys.stdout.flush()
 
         return show_progress_bar
 
@@ -2696,7 +3198,18 @@ class AWSBoto:
             ''').strip()
         return rc
     
-    def _ec2_user_space_script(self, instance_id='', bscript='~/bootstrap.sh'):
+    def _env_credentials(self):
+        # (key id, secret, session token) from the environment, set by ConfigManager
+        # from ~/.aws/credentials, temporary STS credentials also carry a token
+        keyid = os.environ.get('AWS_ACCESS_KEY_ID')
+        secret = os.environ.get('AWS_SECRET_ACCESS_KEY')
+        if not keyid or not secret:
+            print('AWS_ACCESS_KEY_ID and AWS_SECRET_ACCESS_KEY must be set to bootstrap an instance.')
+            print(f'Please check profile "{self.cfg.awsprofile}" in ~/.aws/credentials')
+            return None
+        return keyid, secret, os.environ.get('AWS_SESSION_TOKEN', '')
+
+    def _ec2_user_space_script(self, creds, instance_id='', bscript='~/bootstrap.sh'):
         # Define script that will be installed by ec2-user 
         emailaddr = self.cfg.read('general','email')
         if not emailaddr:
@@ -2704,6 +3217,8 @@ class AWSBoto:
         #short_timezone = datetime.datetime.now().astimezone().tzinfo
         long_timezone = self.cfg.get_time_zone()
         juiceid = f'juice{instance_id.replace("-","")}'
+        keyid, secret, token = creds
+        tokenline = f'aws_session_token = {token}' if token else ''
         return textwrap.dedent(f'''
         #! /bin/bash
         echo "Bootstrapping AWS-EB on {instance_id} ..."
@@ -2732,14 +3247,21 @@ class AWSBoto:
         fi
         $PYBIN -m pip install --upgrade --user pip
         $PYBIN -m pip install --upgrade --user wheel awscli
-        aws configure set aws_access_key_id {os.environ['AWS_ACCESS_KEY_ID']}
-        aws configure set aws_secret_access_key {os.environ['AWS_SECRET_ACCESS_KEY']}
+        mkdir -p ~/.aws
+        ( umask 077 && cat > ~/.aws/credentials <<'EOF'
+        [default]
+        aws_access_key_id = {keyid}
+        aws_secret_access_key = {secret}
+        {tokenline}
+        [{self.cfg.awsprofile}]
+        aws_access_key_id = {keyid}
+        aws_secret_access_key = {secret}
+        {tokenline}
+        EOF
+        )
         aws configure set region {self.cfg.aws_region}
-        aws configure --profile {self.cfg.awsprofile} set aws_access_key_id {os.environ['AWS_ACCESS_KEY_ID']}
-        aws configure --profile {self.cfg.awsprofile} set aws_secret_access_key {os.environ['AWS_SECRET_ACCESS_KEY']}
         aws configure --profile {self.cfg.awsprofile} set region {self.cfg.aws_region}
-        sed -i 's/aws_access_key_id [^ ]*/aws_access_key_id /' {bscript}
-        sed -i 's/aws_secret_access_key [^ ]*/aws_secret_access_key /' {bscript}
+        sed -i -E 's/^(aws_[a-z_]+) = .*/\\1 = /' {bscript}
         sed -i 's/^aws configure /#&/' {bscript}
         curl -s https://raw.githubusercontent.com/apptainer/apptainer/main/tools/install-unprivileged.sh | bash -s - ~/.local
         echo '#! /bin/bash' > ~/.local/bin/get-public-ip
@@ -2764,7 +3286,7 @@ class AWSBoto:
         until [ -f /usr/share/lmod/lmod/init/bash ]; do sleep 3; done; echo "lmod exists, please wait ..."
         if systemctl is-active --quiet redis6 || systemctl is-active --quiet redis; then
           juicefs format --storage s3 --bucket https://s3.{self.cfg.aws_region}.amazonaws.com/{self.cfg.bucket} redis://localhost:6379 {juiceid}
-          juicefs config -y --access-key={os.environ['AWS_ACCESS_KEY_ID']} --secret-key={os.environ['AWS_SECRET_ACCESS_KEY']} --trash-days 0 redis://localhost:6379
+          juicefs config -y --access-key="$(aws configure get aws_access_key_id)" --secret-key="$(aws configure get aws_secret_access_key)" --trash-days 0 redis://localhost:6379
           sudo mkdir -p /mnt/share
           cachedir=/opt/jfsCache
           if [[ -d /mnt/scratch ]]; then
@@ -2773,8 +3295,6 @@ class AWSBoto:
           sudo /usr/local/bin/juicefs mount -d --cache-dir $cachedir --writeback --cache-size 102400 redis://localhost:6379 /mnt/share # --max-uploads 100 --cache-partial-only
           sudo chown {self.cfg.defuser} /mnt/share       
           #juicefs destroy -y redis://localhost:6379 {juiceid}
-          sed -i 's/--access-key=[^ ]*/--access-key=xxx /' {bscript}
-          sed -i 's/--secret-key=[^ ]*/--secret-key=yyy /' {bscript}
           sed -i 's/^  juicefs config /#&/' {bscript}
         fi
         mkdir -p /opt/eb/tmp
@@ -2793,9 +3313,8 @@ class AWSBoto:
     
     def _ec2_launch_instance(self, disk_gib, instance_type, iamprofile=None, profile=None):
         
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ec2 = session.resource('ec2')
-        client = session.client('ec2')
+        ec2 = self._resource('ec2', profile)
+        client = self._client('ec2', profile)
         
         # Define the block device mapping for an EBS volume to be attached to the instance
         block_device_mappings = []
@@ -2815,9 +3334,21 @@ class AWSBoto:
         if not instance_type:
             print("No suitable instance type found!")
             return False
+
+        # the identity, AMI and price lookups are independent API round trips, run them concurrently
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
+        f_ident = executor.submit(self.get_aws_account_and_user_id)
+        f_img = executor.submit(self._ec2_get_latest_ami, profile)
+        if self.args.instancetype:
+            f_spot = executor.submit(self._ec2_current_spot_price, self.args.instancetype, [self.cfg.aws_region])
+            f_od = executor.submit(self._ec2_ondemand_price, self.args.instancetype, self.cfg.aws_region)
+        else:
+            f_spot = executor.submit(self._ec2_get_cheapest_spot_instance, self.args.cputype, self.args.vcpus, self.args.mem)
+            f_od = None
+        executor.shutdown(wait=False)
       
         # Create a new EC2 key pair
-        awsacc, _, username = self.get_aws_account_and_user_id()
+        awsacc, _, username = f_ident.result()
         keyname = f'{self.cfg.ssh_key_name}-{username}'
         key_path = os.path.join(self.cfg.config_root,'cloud',
                 f'{self.cfg.ssh_key_name}-{awsacc}-{username}.pem')
@@ -2839,14 +3370,7 @@ class AWSBoto:
                 key_file.write(key_pair.key_material)
             os.chmod(key_path, 0o600)  # Set file permission to 600
 
-        if self.args.os.lower() == 'amazon':
-            imageid = self._ec2_get_latest_amazon_linux_ami(profile)
-        elif self.args.os.lower() == 'ubuntu':
-            imageid = self._ec2_get_latest_ubuntu_lts_ami(profile)
-        elif self.args.os.lower() == 'rhel':
-            imageid = self._ec2_get_latest_rocky_linux_ami(profile)
-        else:
-            imageid = self._ec2_get_latest_other_linux_ami(self.args.os, profile)
+        imageid = f_img.result()
         
         if not imageid:
             print(f'No {self.args.os} image found that matches the criteria.')
@@ -2866,12 +3390,13 @@ class AWSBoto:
         # iam_instance_profile = {}
         #print(f'AWS Region: {self.cfg.aws_region}')
         
-        instance_type, az, price_spot = self._ec2_get_cheapest_spot_instance(self.args.cputype, self.args.vcpus, self.args.mem)
-        
         if self.args.instancetype:
             instance_type = self.args.instancetype             
-            price_spot, az = self._ec2_current_spot_price(instance_type, [self.cfg.aws_region])
-        price_ondemand = float(self._ec2_ondemand_price(instance_type, self.cfg.aws_region))
+            price_spot, az = f_spot.result()
+            price_ondemand = float(f_od.result())
+        else:
+            instance_type, az, price_spot = f_spot.result()
+            price_ondemand = float(self._ec2_ondemand_price(instance_type, self.cfg.aws_region))
 
         print(f'{instance_type} in {az} costs ${price_ondemand:.4f} as on-demand and ${price_spot:.4f} as spot.')
 
@@ -2930,6 +3455,8 @@ class AWSBoto:
                     print(f'Access denied! Please check your IAM permissions. \n   Error: {e}')
                     sys.exit(1)
                 elif error_code == 'SpotMaxPriceTooLow':
+                    # the cached spot prices are outdated
+                    self._disk_cache_save('spot_price', {})
                     errmsg = e.response['Error']['Message']
                     print (f"{errmsg}")
                     price_spot = self._extract_last_float(errmsg)
@@ -2973,14 +3500,22 @@ class AWSBoto:
         waiter = client.get_waiter('instance_running')
         progress = self._create_progress_bar(max_attempts)
 
-        for attempt in range(max_attempts):
-            try:
-                waiter.wait(InstanceIds=[instance_id], WaiterConfig={'Delay': delay_time, 'MaxAttempts': 1})
-                progress(attempt)
-                break
-            except botocore.exceptions.WaiterError:
+        # the waiter polls on its own, a thread advances the progress bar meanwhile
+        done = threading.Event()
+        def tick():
+            for attempt in range(max_attempts):
                 progress(attempt)
-                continue
+                if done.wait(delay_time):
+                    return
+        ticker = threading.Thread(target=tick, daemon=True)
+        ticker.start()
+        try:
+            waiter.wait(InstanceIds=[instance_id], WaiterConfig={'Delay': delay_time, 'MaxAttempts': max_attempts})
+        except botocore.exceptions.WaiterError as e:
+            self.cfg.printdbg(f'Instance {instance_id} not running after {max_wait_time}s: {e}')
+        finally:
+            done.set()
+            ticker.join()
         print('')
         instance.reload()        
 
@@ -2996,12 +3531,17 @@ class AWSBoto:
 
         return instance_id, instance.public_ip_address
 
+    def _ec2_describe_instances(self, ec2, **kwargs):
+        # all instances of all pages and reservations of describe_instances
+        paginator = ec2.get_paginator('describe_instances')
+        return [instance for page in paginator.paginate(**kwargs) 
+                for reservation in page['Reservations'] for instance in reservation['Instances']]
+
     def ec2_terminate_instance(self, ip, profile=None):
         # terminate instance  
         # with ephemeral (local) disk for a temporary restore 
 
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()        
-        ec2 = session.client('ec2')
+        ec2 = self._client('ec2', profile)
         #ips = self.ec2_list_ips(self, 'Name', 'AWSEBSelfDestruct')    
         # Use describe_instances with a filter for the public IP address to find the instance ID
         filters = [{
@@ -3011,12 +3551,11 @@ class AWSBoto:
 
         if not ip.startswith('i-'): # this an ip and not an instance ID
             try:
-                response = ec2.describe_instances(Filters=filters)        
+                instances = self._ec2_describe_instances(ec2, Filters=filters)
             except botocore.exceptions.ClientError as e: 
                 print(f'Error: {e}')
                 return False
             # Check if any instances match the criteria
-            instances = [instance for reservation in response['Reservations'] for instance in reservation['Instances']]        
             if not instances:
                 print(f"No EC2 instance found with public IP: {ip}")
                 return 
@@ -3056,7 +3595,7 @@ class AWSBoto:
         :return: List of IP addresses
         """
         #session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ec2 = self.awssession.client('ec2')        
+        ec2 = self._client('ec2', self.awsprofile)        
         
         # Define the filter
         filters = [
@@ -3072,7 +3611,7 @@ class AWSBoto:
         
         # Make the describe instances call
         try:
-            response = ec2.describe_instances(Filters=filters)        
+            instances = self._ec2_describe_instances(ec2, Filters=filters)
         except botocore.exceptions.ClientError as e:
             error_code = e.response['Error']['Code']
             if error_code == 'AccessDenied':
@@ -3085,75 +3624,115 @@ class AWSBoto:
             return []
         #An error occurred (AuthFailure) when calling the DescribeInstances operation: AWS was not able to validate the provided access credentials
         ilist = []    
+        # one describe_images call for the AMIs of all instances
+        ami_ids = {instance['ImageId'] for instance in instances}
+        ami_map = {}
+        if ami_ids:
+            ami_map = {img['ImageId']: img for img in ec2.describe_images(ImageIds=list(ami_ids))['Images']}
+        # and one describe_instance_status call for their reachability
+        instance_ids = [instance['InstanceId'] for instance in instances]
+        failed = self.monitor_have_instances_failed(instance_ids) if instance_ids else {}
+        # one reference time for the uptime of all instances
+        now = datetime.datetime.now(datetime.timezone.utc) 
         # Extract IP addresses
-        for reservation in response['Reservations']:
-            for instance in reservation['Instances']:
-                status = '(Running)'
-                if self.monitor_has_instance_failed(instance['InstanceId'], False):
-                    status = '(Failed)'
-                else:
-                    status = '(OK)'
-
-                # Get the AMI ID used by the instance
-                ami_id = instance['ImageId']
-
-                # Retrieve information about the AMI
-                ami_response = ec2.describe_images(ImageIds=[ami_id])
-                ami_info = ami_response['Images'][0]
-                # Extract OS information from the AMI description or name
-                #print(ami_info)
-                #os_info = ami_info.get('Description') or ami_info.get('Name')
-                os_info = ami_info.get('Name')
-                if os_info:
-                    os_info = self.cfg.parse_version_string(os_info) #.replace('ubuntu/images/hvm-ssd/','').strip()
-                
-                # lt = ''
-                # if instance['LaunchTime']:
-                #     lt = instance['LaunchTime'].strftime("%m-%d %H:%M")
-                now = datetime.datetime.now(datetime.timezone.utc) 
-                uptime = now - instance['LaunchTime']  # Calculate uptime       
-                # Convert uptime to days, hours, and minutes
-                uptime_days = uptime.days
-                uptime_hours = uptime.seconds // 3600
-                uptime_minutes = (uptime.seconds % 3600) // 60
-                uptime_formatted = f"{uptime_days:02d}-{uptime_hours:02d}:{uptime_minutes:02d}"
-
-                row = [instance['PublicIpAddress'],
-                       instance['InstanceId'],
-                       instance['InstanceType'],
-                       os_info.lower(),
-                       uptime_formatted,
-                       status
-                       ]
-                ilist.append(row)
-        ilist.sort(key=lambda x: x[-2],reverse=True)  # Assuming the last element in each row is the launch time
+        for instance in instances:
+            status = '(Running)'
+            if failed[instance['InstanceId']]:
+                status = '(Failed)'
+            else:
+                status = '(OK)'
+
+            # Get the AMI ID used by the instance
+            ami_id = instance['ImageId']
+
+            # information about the AMI, empty if it was deregistered
+            ami_info = ami_map.get(ami_id, {})
+            # Extract OS information from the AMI description or name
+            #print(ami_info)
+            #os_info = ami_info.get('Description') or ami_info.get('Name')
+            os_info = ami_info.get('Name')
+            if os_info:
+                os_info = self.cfg.parse_version_string(os_info) #.replace('ubuntu/images/hvm-ssd/','').strip()
+            else:
+                os_info = ''
+            
+            # lt = ''
+            # if instance['LaunchTime']:
+            #     lt = instance['LaunchTime'].strftime("%m-%d %H:%M")
+            uptime = now - instance['LaunchTime']  # Calculate uptime       
+            # Convert uptime to days, hours, and minutes
+            uptime_days = uptime.days
+            uptime_hours = uptime.seconds // 3600
+            uptime_minutes = (uptime.seconds % 3600) // 60
+            uptime_formatted = f"{uptime_days:02d}-{uptime_hours:02d}:{uptime_minutes:02d}"
+
+            row = [instance['PublicIpAddress'],
+                   instance['InstanceId'],
+                   instance['InstanceType'],
+                   os_info.lower(),
+                   uptime_formatted,
+                   status
+                   ]
+            ilist.append(row)
+        ilist.sort(key=operator.itemgetter(-2), reverse=True)  # the uptime column, longest running first
         return ilist
 
-    def ssh_execute(self, user, host, command=None):
-        """Execute an SSH command on the remote server."""
-        SSH_OPTIONS = "-o StrictHostKeyChecking=no"
+    @functools.cached_property
+    def _ssh_key_path(self):
+        # one STS call per run instead of one per ssh/scp 
         awsacc, _, username = self.get_aws_account_and_user_id()
-        key_path = os.path.join(self.cfg.config_root,'cloud',
+        return os.path.join(self.cfg.config_root,'cloud',
                 f'{self.cfg.ssh_key_name}-{awsacc}-{username}.pem')
-        cmd = f"ssh {SSH_OPTIONS} -i '{key_path}' {user}@{host}"
+
+    def _ssh_options(self, batch=True, master=True):
+        # share one ssh connection between consecutive ssh/scp calls to the 
+        # same host (OpenSSH multiplexing), saves a TCP + auth handshake per call.
+        # Only start a master when output is not captured, older OpenSSH versions 
+        # keep stderr of the persistent master open and subprocess.run would hang
+        cpath = os.path.join(tempfile.gettempdir(), 'aws-eb-ssh-%C')
+        opts = f"-o StrictHostKeyChecking=no -o ControlPath='{cpath}'"
+        opts += " -o ControlMaster=auto -o ControlPersist=60" if master else " -o ControlMaster=no"
+        if batch:
+            opts += " -o BatchMode=yes"
+        return opts
+
+    def ssh_master(self, user, host, persist=300):
+        # start a background master connection with all stdio detached, the 
+        # scp/ssh calls that capture output (ControlMaster=no) still reuse it 
+        cpath = os.path.join(tempfile.gettempdir(), 'aws-eb-ssh-%C')
+        cmd = ['ssh', '-o', 'StrictHostKeyChecking=no', '-o', 'BatchMode=yes', 
+               '-o', f'ControlPath={cpath}', '-o', 'ControlMaster=auto', 
+               '-o', f'ControlPersist={persist}', '-i', self._ssh_key_path, 
+               '-N', '-f', f'{user}@{host}']
+        try:
+            return subprocess.run(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, 
+                                  stderr=subprocess.DEVNULL).returncode == 0
+        except Exception as e:
+            print(f'Error starting ssh master connection to {host}: {e}')
+            return False
+
+    def ssh_execute(self, user, host, command=None):
+        """Execute an SSH command on the remote server."""
+        SSH_OPTIONS = self._ssh_options(batch=False)
+        key_path = self._ssh_key_path
+        # argument list instead of shell=True, no extra /bin/sh and no quoting issues
+        cmd = ['ssh', *shlex.split(SSH_OPTIONS), '-i', key_path, f'{user}@{host}']
         if command:
-            cmd += f" '{command}'"
+            cmd.append(command)
             try:
-                result = subprocess.run(cmd, shell=True, text=True) #capture_output=True
+                result = subprocess.run(cmd, text=True) #capture_output=True
                 return result
             except:
-                print(f'Error executing "{cmd}."')
+                print(f'Error executing "{shlex.join(cmd)}."')
         else:
-            subprocess.run(cmd, shell=True, text=True) #capture_output=False
-        self.cfg.printdbg(f'ssh command line: {cmd}')
+            subprocess.run(cmd, text=True) #capture_output=False
+        self.cfg.printdbg(f'ssh command line: {shlex.join(cmd)}')
         return None
                 
     def ssh_upload(self, user, host, local_path, remote_path, is_string=False, cap_output=True):
         """Upload a file to the remote server using SCP."""
-        SSH_OPTIONS = "-o StrictHostKeyChecking=no -o BatchMode=yes"
-        awsacc, _, username = self.get_aws_account_and_user_id()
-        key_path = os.path.join(self.cfg.config_root,'cloud',
-                f'{self.cfg.ssh_key_name}-{awsacc}-{username}.pem')
+        SSH_OPTIONS = self._ssh_options(master=not cap_output)
+        key_path = self._ssh_key_path
         if is_string:
             # the local_path is actually a string that needs to go into temp file 
             with tempfile.NamedTemporaryFile(mode='w+', delete=False) as temp:
@@ -3170,12 +3749,25 @@ class AWSBoto:
             print(f'Error executing "{cmd}" in ssh_upload: {e}')
         return None
 
+    def ssh_upload_dir(self, user, host, local_dir, remote_parent, cap_output=True):
+        """Upload a folder into remote_parent (created if needed) with tar over one ssh call."""
+        SSH_OPTIONS = self._ssh_options(master=not cap_output)
+        key_path = self._ssh_key_path
+        local_dir = os.path.expanduser(local_dir).rstrip(os.path.sep)
+        parent, name = os.path.split(local_dir)
+        remote = shlex.quote(f'mkdir -p {remote_parent} && tar -xf - -C {remote_parent}')
+        cmd = (f"tar -cf - -C {shlex.quote(parent)} {shlex.quote(name)} | "
+               f"ssh {SSH_OPTIONS} -i '{key_path}' {user}@{host} {remote}")
+        try:
+            return subprocess.run(cmd, shell=True, text=True, capture_output=cap_output)
+        except Exception as e:
+            print(f'Error executing "{cmd}" in ssh_upload_dir: {e}')
+        return None
+
     def ssh_download(self, user, host, remote_path, local_path, cap_output=True):
         """Upload a file to the remote server using SCP."""
-        SSH_OPTIONS = "-o StrictHostKeyChecking=no -o BatchMode=yes"
-        awsacc, _, username = self.get_aws_account_and_user_id()
-        key_path = os.path.join(self.cfg.config_root,'cloud',
-                f'{self.cfg.ssh_key_name}-{awsacc}-{username}.pem')
+        SSH_OPTIONS = self._ssh_options(master=not cap_output)
+        key_path = self._ssh_key_path
         cmd = f"scp {SSH_OPTIONS} -i '{key_path}' {user}@{host}:{remote_path} {local_path}"        
         try:
             result = subprocess.run(cmd, shell=True, text=True, capture_output=cap_output)
@@ -3203,8 +3795,7 @@ class AWSBoto:
 
     def send_email_ses(self, sender, to, subject, body, profile=None):
         # Using AWS ses service to send emails
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ses = session.client("ses")
+        ses = self._client("ses", profile)
 
         ses_verify_requests_sent = []
         if not sender:
@@ -3293,9 +3884,8 @@ class AWSBoto:
         pass
 
     def _ec2_create_iam_costexplorer_ses(self, instance_id ,profile=None):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        iam = session.client('iam')
-        ec2 = session.client('ec2')
+        iam = self._client('iam', profile)
+        ec2 = self._client('ec2', profile)
 
         # Define the policy
         policy_document = {
@@ -3356,8 +3946,7 @@ class AWSBoto:
 
 
     def _ec2_create_iam_self_destruct_role(self, profile):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        iam = session.client('iam')
+        iam = self._client('iam', profile)
 
         # Step 1: Create IAM policy
         policy_document = {
@@ -3512,27 +4101,39 @@ class AWSBoto:
         """
         Check if the Instance reachability status check has failed for a given EC2 instance.
         """
-        #session = boto3.Session(profile_name=profile) if profile else boto3.Session()
-        ec2_client = self.awssession.client('ec2')  
-
-        # Fetch the status of the instance
-        response = ec2_client.describe_instance_status(InstanceIds=[instance_id])
-
-        # Check if the status check response is available
-        if not response['InstanceStatuses']:
-            if print_error:
-                print(f"No status information found for instance {instance_id}.")
-            return True
-
-        # Extract the instance status
-        instance_status = response['InstanceStatuses'][0]['InstanceStatus']
-        reachability_status = instance_status['Details'][0]['Status']
-        if reachability_status == 'impaired' or reachability_status == 'failed':
-            if print_error:
-                print(f"Instance {instance_id} has failed the reachability status check.")
-            return True
+        failed = self.monitor_have_instances_failed([instance_id])[instance_id]
+        if failed and print_error:
+            print(failed)
+        return bool(failed)
 
-        return False
+    def monitor_have_instances_failed(self, instance_ids):
+        """
+        Reachability status of many EC2 instances with one describe_instance_status call,
+        returns {instance_id: error message or '' if the instance is ok}
+        """
+        #session = boto3.Session(profile_name=profile) if profile else boto3.Session()
+        ec2_client = self._client('ec2', self.awsprofile)  
+
+        # Fetch the status of the instances, at most 100 ids per request
+        instance_ids = list(instance_ids)
+        statuses = {}
+        for i in range(0, len(instance_ids), 100):
+            response = ec2_client.describe_instance_status(InstanceIds=instance_ids[i:i+100])
+            statuses.update((s['InstanceId'], s['InstanceStatus']) for s in response['InstanceStatuses'])
+
+        failed = {}
+        for instance_id in instance_ids:
+            # Check if the status check response is available
+            if instance_id not in statuses:
+                failed[instance_id] = f"No status information found for instance {instance_id}."
+                continue
+            # Extract the instance status
+            reachability_status = statuses[instance_id]['Details'][0]['Status']
+            if reachability_status == 'impaired' or reachability_status == 'failed':
+                failed[instance_id] = f"Instance {instance_id} has failed the reachability status check."
+            else:
+                failed[instance_id] = ''
+        return failed
 
 
     def _monitor_users_logged_in(self):
@@ -3641,11 +4242,10 @@ class AWSBoto:
         return count >= min_idle_cnt        
 
     def _monitor_get_ec2_costs(self, profile=None):
-        session = boto3.Session(profile_name=profile) if profile else boto3.Session()
         
         # Set up boto3 client for Cost Explorer
-        ce = session.client('ce')
-        sts = session.client('sts')
+        ce = self._client('ce', profile)
+        sts = self._client('sts', profile)
 
         # Identify current user/account
         identity = sts.get_caller_identity()
@@ -3802,6 +4402,7 @@ class ConfigManager:
             self.awsprofile = ''
         self.ssh_key_name = 'aws-eb-ec2'
         self.scriptname = os.path.basename(__file__)
+        self._os_pkgs_done = set() # package tuples already handled by install_os_packages
         
     def _set_env_vars(self, profile):
         
@@ -3861,6 +4462,7 @@ class ConfigManager:
 
         return True
 
+    @functools.lru_cache(maxsize=4096)
     def sversion(self, version_str):
         """
         Parse a semantic versioning string into a tuple of integers.
@@ -3878,7 +4480,9 @@ class ConfigManager:
                 version.append(part)  # Keep non-numeric strings as is
         return tuple(version)
     
-    def get_os_release_info(self):
+    @functools.cached_property
+    def os_release_info(self):
+        # (os_id, version_id) from /etc/os-release, parsed only once
         try:
             # Initialize the values
             os_id = ""
@@ -3965,26 +4569,59 @@ class ConfigManager:
         # pkg_list can be a simple list of strings or a list of tuples 
         # if a package has a different name on different OSes
         os_type = self._get_os_type()
+        apt_os = ['debian', 'ubuntu']
+        dnf_os = ['fedora', 'centos', 'redhat', 'rhel']
         # Determine the appropriate package manager for the detected OS type
         package_manager = None
-        if os_type in ['debian', 'ubuntu']:
+        if os_type in apt_os:
             package_manager = 'apt'
-        elif os_type in ['fedora', 'centos', 'redhat', 'rhel']:
+        elif os_type in dnf_os:
             package_manager = 'dnf'        
         if not package_manager:
             print("Unsupported operating system.")
             return        
+        if isinstance(pkg_list, str):
+            pkg_list = [pkg_list]
+        # skip everything an earlier call has already taken care of 
+        todo = []; seen = set() # todo keeps the order, seen is for lookups
         for package_tuple in pkg_list:
             if isinstance(package_tuple, str):
                 package_tuple = (package_tuple,)
+            package_tuple = tuple(package_tuple)
+            if package_tuple not in self._os_pkgs_done and package_tuple not in seen:
+                seen.add(package_tuple)
+                todo.append(package_tuple)
+        if not todo:
+            return
+        # try one package manager run for all packages first, using the 
+        # preferred name of each tuple, and fall back to one by one on failure.
+        # Packages are only marked as done once installed, failures are retried
+        suffix = '-dev' if os_type in apt_os else '-devel'
+        bulk = []
+        for package_tuple in todo:
+            names = [p for p in package_tuple if p not in package_skip_set]
+            if names:
+                bulk.append(next((p for p in names if p.endswith(suffix)), names[0]))
+            else:
+                self._os_pkgs_done.add(package_tuple)
+        if not bulk:
+            return
+        try:
+            print(f"Installing {' '.join(bulk)} with {package_manager}")
+            subprocess.run(['sudo', package_manager, 'install', '-y'] + bulk, check=True)
+            self._os_pkgs_done.update(todo)
+            return
+        except subprocess.CalledProcessError:
+            print(f"Bulk install failed, installing packages one by one ...")
+        for package_tuple in todo:
             installed = False
             for package_name in package_tuple:
                 # Check if the package has a known OS-specific suffix
                 if package_name in package_skip_set:
                     print(f"Skipping {package_name} because it was already installed.")
                     continue
-                if (package_name.endswith('-dev') and os_type in ['debian', 'ubuntu']) or \
-                (package_name.endswith('-devel') and os_type in ['fedora', 'centos', 'redhat']):
+                if (package_name.endswith('-dev') and os_type in apt_os) or \
+                (package_name.endswith('-devel') and os_type in dnf_os):
                     try:
                         print(f"Installing {package_name} with {package_manager}")                    
                         subprocess.run(['sudo', package_manager, 'install', '-y', package_name], check=True)
@@ -4002,11 +4639,14 @@ class ConfigManager:
                         print(f"Attempting to install {package_name} with {package_manager}")
                         subprocess.run(['sudo', package_manager, 'install', '-y', package_name], check=True)
                         print(f"Installed {package_name} successfully.")
+                        installed = True
                         break  # Stop trying after the first successful install
                     except subprocess.CalledProcessError:
                         # If the package installation failed, it might be the wrong package for the OS,
                         # so continue trying the next packages in the tuple
                         pass
+            if installed:
+                self._os_pkgs_done.add(package_tuple)
 
 
 
@@ -4301,6 +4941,11 @@ class ConfigManager:
 
     def get_aws_profiles(self):
         # get the full list of profiles from ~/.aws/ profile folder
+        return list(self._load_aws_profiles())
+
+    @functools.lru_cache(maxsize=1)
+    def _load_aws_profiles(self):
+        # cached, call _invalidate_aws_caches() after changing ~/.aws files
         config = configparser.ConfigParser()        
         # Read the AWS config file ---- optional, we only require a creds file
         if os.path.exists(self.awsconfigfile):
@@ -4313,8 +4958,12 @@ class ConfigManager:
         for section in config.sections():
             profile_name = section.replace("profile ", "") #.replace("default", "default")
             profiles.append(profile_name)
-        # convert list to set and back to list to remove dups
-        return list(set(profiles))
+        # convert list to set and back to a tuple to remove dups
+        return tuple(set(profiles))
+
+    def _invalidate_aws_caches(self):
+        self._load_aws_profiles.cache_clear()
+        self.get_aws_region.cache_clear()
 
     def create_aws_configs(self,access_key=None, secret_key=None, region=None):
 
@@ -4346,6 +4995,7 @@ class ConfigManager:
                 credentials_file.write(f"aws_access_key_id = {access_key}\n")
                 credentials_file.write(f"aws_secret_access_key = {secret_key}\n")
             os.chmod(self.awscredsfile, 0o600)
+        self._invalidate_aws_caches()
 
     def set_aws_config(self, profile, key, value, service=''):
         if key == 'endpoint_url': 
@@ -4366,6 +5016,7 @@ class ConfigManager:
             config.set(section, key, value)
         with open(os.path.expanduser("~/.aws/config"), 'w') as configfile:
             config.write(configfile)
+        self._invalidate_aws_caches()
         return True
     
     def get_aws_s3_endpoint_url(self, profile=None):
@@ -4403,7 +5054,9 @@ class ConfigManager:
             print('*** endpoint url ***:', endpoint_url)
         return endpoint_url
 
+    @functools.lru_cache(maxsize=32)
     def get_aws_region(self, profile=None):
+        _import_boto3()
         try:            
             session = boto3.Session(profile_name=profile) if profile else boto3.Session()
             if self.args.debug:
@@ -4414,7 +5067,8 @@ class ConfigManager:
                 print(f'  cannot retrieve AWS region for profile {profile}, no valid profile or credentials')
             return ""
             
-    def get_domain_name(self):
+    @functools.cached_property
+    def domain_name(self):
         try:
             with open('/etc/resolv.conf', 'r') as file:
                 content = file.readlines()
@@ -4588,6 +5242,28 @@ class ConfigManager:
                     dirs.remove(skipdir)  # don't visit this directory 
             yield root, dirs, files 
 
+    def _walk_eb_dirs(self, top, skipdirs=['.snapshot', '__archive__']):
+        """ yields (dirpath, basename) of all folders that contain *.eb files """
+        stack = [top]
+        while stack:
+            dirpath = stack.pop()
+            has_eb = False
+            subdirs = []
+            try:
+                with os.scandir(dirpath) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in skipdirs:
+                                subdirs.append(entry.path)
+                        elif not has_eb and entry.name.endswith('.eb') and entry.is_file(follow_symlinks=False):
+                            has_eb = True
+            except OSError as e:
+                self._walkerr(e)
+                continue
+            if has_eb:
+                yield dirpath, os.path.basename(dirpath)
+            stack.extend(reversed(subdirs))
+
     def _walkerr(self, oserr):    
         sys.stderr.write(str(oserr))
         sys.stderr.write('\n')
@@ -4613,19 +5289,24 @@ class ConfigManager:
                     print(f"Compilation failed: {compilecmd}")
 
     def copy_binary_from_zip_url(self,zipurl,binary,subwildcard,targetfolder):
-        with tempfile.TemporaryDirectory() as tmpdirname:
-            zip_file = os.path.join(tmpdirname,  "download.zip")
-            response = requests.get(zipurl, verify=False, allow_redirects=True)
-            with open(zip_file, 'wb') as f:
-                f.write(response.content)
-            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
-                zip_ref.extractall(tmpdirname)
-            binpath = glob.glob(f'{tmpdirname}{subwildcard}{binary}')[0]
-            shutil.copy2(binpath, targetfolder, follow_symlinks=True)
-            if os.path.exists(os.path.join(targetfolder, binary)):
-                os.chmod(os.path.join(targetfolder, binary), 0o775)
-            else:    
-                print(f'Failed copying {binary} to {targetfolder}')
+        # stream the zip into memory and extract only the one member we need
+        response = requests.get(zipurl, verify=False, allow_redirects=True, stream=True)
+        response.raise_for_status()
+        buf = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=1024*1024):
+            buf.write(chunk)
+        buf.seek(0)
+        targetpath = os.path.join(targetfolder, binary)
+        with zipfile.ZipFile(buf) as zip_ref:
+            member = next((n for n in zip_ref.namelist() 
+                           if fnmatch.fnmatch(f'/{n}', f'{subwildcard}{binary}')), None)
+            if member:
+                with zip_ref.open(member) as src, open(targetpath, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, 1024*1024)
+        if member and os.path.exists(targetpath):
+            os.chmod(targetpath, 0o775)
+        else:    
+            print(f'Failed copying {binary} to {targetfolder}')
 
 def parse_arguments():
     """